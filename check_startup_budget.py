@@ -0,0 +1,95 @@
+"""Cold-start budget check for the app and the headless rendering core.
+
+Imports each module in a fresh interpreter under ``python -X importtime`` and
+fails when its cumulative import time exceeds the budget, or when a heavy
+dependency (PIL, ReportLab, requests, dateutil) is loaded at import time
+instead of on first use.
+
+Usage:
+    python check_startup_budget.py            # best of 5 runs per module
+    python check_startup_budget.py --runs 10
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Cumulative import time budget per module, in milliseconds
+STARTUP_BUDGETS_MS = {
+    "sxs_render": 60,
+    "sxs_webhook": 30,
+    "sxs_pdf_generator": 900,  # Dominated by importing Streamlit itself
+}
+
+# Dependencies that must only be imported on first use
+DEFERRED_MODULES = ["PIL", "reportlab", "requests", "dateutil"]
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def measure_import(module: str) -> Tuple[float, List[str]]:
+    """Import a module in a fresh interpreter; return (cumulative ms, deferred modules loaded)"""
+    probe = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=REPO_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    cumulative_us = None
+    for line in result.stderr.splitlines():
+        # Format: "import time: <self us> | <cumulative us> | <module>"
+        if not line.startswith("import time:"):
+            continue
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].rstrip() == f" {module}":
+            cumulative_us = int(parts[1])
+
+    if cumulative_us is None:
+        raise RuntimeError(f"No importtime entry found for {module}")
+
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return cumulative_us / 1000, loaded
+
+def check_budgets(runs: int) -> Dict[str, dict]:
+    """Measure every budgeted module, keeping the best of several runs"""
+    report = {}
+    for module, budget_ms in STARTUP_BUDGETS_MS.items():
+        timings = []
+        loaded = []
+        for _ in range(runs):
+            elapsed_ms, loaded = measure_import(module)
+            timings.append(elapsed_ms)
+
+        best_ms = min(timings)
+        report[module] = {
+            "best_ms": best_ms,
+            "budget_ms": budget_ms,
+            "eager_imports": loaded,
+            "ok": best_ms <= budget_ms and not loaded
+        }
+    return report
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check module cold-start import budgets")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module (best run counts)")
+    args = parser.parse_args(argv)
+
+    report = check_budgets(max(1, args.runs))
+    for module, entry in report.items():
+        status = "OK  " if entry["ok"] else "FAIL"
+        eager = f"  eager: {', '.join(entry['eager_imports'])}" if entry["eager_imports"] else ""
+        print(f"{status} {module:<20} {entry['best_ms']:8.1f} ms / {entry['budget_ms']} ms{eager}")
+
+    return 0 if all(entry["ok"] for entry in report.values()) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
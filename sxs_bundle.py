@@ -0,0 +1,206 @@
+"""Reproducible SxS input bundles.
+
+A bundle is a zip archive holding everything needed to re-render a deck:
+
+    manifest.json              question ID, prompt, models, SOT fields, image order
+    images/<sha256>.<ext>      content-addressed screenshots and prompt image
+
+Identical images are stored once, and every image is checked against its
+hash when the bundle is read. Images are stored uncompressed because
+PNG/JPEG data is already compressed, so reading a bundle back is mostly
+plain archive I/O.
+"""
+
+import hashlib
+import io
+import json
+import os
+import zipfile
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import BinaryIO, Callable, Dict, List, Optional, Union
+
+from sxs_render import CancellationToken, ProgressEvent, RenderResult, render_deck
+
+# ============================================================================
+# CONSTANTS & CONFIGURATION
+# ============================================================================
+
+BUNDLE_FORMAT = "sxs-bundle"
+BUNDLE_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+IMAGE_DIR = "images"
+BUNDLE_EXTENSION = ".sxsbundle.zip"
+
+# ============================================================================
+# BUNDLE MODEL
+# ============================================================================
+
+class BundleError(Exception):
+    """Raised when a bundle is malformed or fails integrity checks"""
+
+@dataclass
+class BundleImage:
+    """An image stored in a bundle under its content hash"""
+    filename: str
+    data: bytes
+    sha256: str = ""
+
+    def __post_init__(self):
+        if not self.sha256:
+            self.sha256 = hashlib.sha256(self.data).hexdigest()
+
+    @property
+    def archive_path(self) -> str:
+        extension = os.path.splitext(self.filename)[1].lower() or ".bin"
+        return f"{IMAGE_DIR}/{self.sha256}{extension}"
+
+    def open(self) -> io.BytesIO:
+        """File-like view of the image, named like the original upload"""
+        image_file = io.BytesIO(self.data)
+        image_file.name = self.filename
+        image_file.size = len(self.data)
+        return image_file
+
+    @classmethod
+    def from_file(cls, file_obj: BinaryIO, filename: Optional[str] = None) -> "BundleImage":
+        """Snapshot an uploaded or opened file without moving its read position"""
+        position = file_obj.tell()
+        file_obj.seek(0)
+        data = file_obj.read()
+        file_obj.seek(position)
+        return cls(filename or os.path.basename(getattr(file_obj, "name", "") or "image.png"), data)
+
+@dataclass
+class SxsBundle:
+    """All inputs of one SxS comparison"""
+    question_id: str
+    prompt: str
+    model1: str
+    model2: str
+    model1_images: List[BundleImage] = field(default_factory=list)
+    model2_images: List[BundleImage] = field(default_factory=list)
+    prompt_image: Optional[BundleImage] = None
+    task_id: str = ""
+    sot: Dict[str, str] = field(default_factory=dict)  # language, project_type, model_comparison
+    created_at: str = ""
+
+    def to_manifest(self) -> dict:
+        def describe(image: BundleImage) -> dict:
+            return {"filename": image.filename, "sha256": image.sha256, "path": image.archive_path}
+
+        return {
+            "format": BUNDLE_FORMAT,
+            "version": BUNDLE_VERSION,
+            "created_at": self.created_at or datetime.now().isoformat(),
+            "question_id": self.question_id,
+            "task_id": self.task_id,
+            "prompt": self.prompt,
+            "model1": self.model1,
+            "model2": self.model2,
+            "sot": self.sot,
+            "prompt_image": describe(self.prompt_image) if self.prompt_image else None,
+            "model1_images": [describe(image) for image in self.model1_images],
+            "model2_images": [describe(image) for image in self.model2_images]
+        }
+
+# ============================================================================
+# READ / WRITE
+# ============================================================================
+
+def write_bundle(bundle: SxsBundle, target: Union[str, BinaryIO]):
+    """Write a bundle zip to a path or binary file object"""
+    images = list(bundle.model1_images) + list(bundle.model2_images)
+    if bundle.prompt_image:
+        images.append(bundle.prompt_image)
+
+    with zipfile.ZipFile(target, "w") as archive:
+        archive.writestr(
+            MANIFEST_NAME,
+            json.dumps(bundle.to_manifest(), indent=2, ensure_ascii=False),
+            compress_type=zipfile.ZIP_DEFLATED
+        )
+        written = set()
+        for image in images:
+            if image.archive_path in written:
+                continue  # Content-addressed: identical images are stored once
+            archive.writestr(image.archive_path, image.data, compress_type=zipfile.ZIP_STORED)
+            written.add(image.archive_path)
+
+def bundle_to_bytes(bundle: SxsBundle) -> bytes:
+    """Serialize a bundle to zip bytes (e.g. for a download button)"""
+    output = io.BytesIO()
+    write_bundle(bundle, output)
+    return output.getvalue()
+
+def read_bundle(source: Union[str, BinaryIO]) -> SxsBundle:
+    """Load and verify a bundle from a path or binary file object"""
+    try:
+        with zipfile.ZipFile(source) as archive:
+            try:
+                manifest = json.loads(archive.read(MANIFEST_NAME).decode("utf-8"))
+            except KeyError:
+                raise BundleError(f"Bundle has no {MANIFEST_NAME}")
+
+            if not isinstance(manifest, dict):
+                raise BundleError(f"{MANIFEST_NAME} is not a JSON object")
+            if manifest.get("format") != BUNDLE_FORMAT:
+                raise BundleError("Not an SxS bundle")
+            if manifest.get("version", 0) > BUNDLE_VERSION:
+                raise BundleError(f"Unsupported bundle version {manifest.get('version')}")
+
+            cache: Dict[str, BundleImage] = {}
+
+            def load_image(entry: Optional[dict]) -> Optional[BundleImage]:
+                if not entry:
+                    return None
+                path = entry["path"]
+                if path not in cache:
+                    data = archive.read(path)
+                    digest = hashlib.sha256(data).hexdigest()
+                    if digest != entry["sha256"]:
+                        raise BundleError(f"Checksum mismatch for {entry.get('filename', path)}")
+                    cache[path] = BundleImage(entry.get("filename", os.path.basename(path)), data, digest)
+                return cache[path]
+
+            return SxsBundle(
+                question_id=manifest["question_id"],
+                prompt=manifest["prompt"],
+                model1=manifest["model1"],
+                model2=manifest["model2"],
+                model1_images=[load_image(entry) for entry in manifest.get("model1_images", [])],
+                model2_images=[load_image(entry) for entry in manifest.get("model2_images", [])],
+                prompt_image=load_image(manifest.get("prompt_image")),
+                task_id=manifest.get("task_id", ""),
+                sot=manifest.get("sot", {}),
+                created_at=manifest.get("created_at", "")
+            )
+
+    except zipfile.BadZipFile as e:
+        raise BundleError(f"Not a valid zip archive: {e}")
+    except KeyError as e:
+        raise BundleError(f"Bundle manifest or archive is missing {e}")
+    except (ValueError, TypeError, AttributeError) as e:
+        # Corrupt JSON or text, or manifest fields of the wrong type
+        raise BundleError(f"Malformed bundle manifest: {e}")
+
+def render_bundle(source: Union[str, BinaryIO],
+                  progress_callback: Optional[Callable[[ProgressEvent], None]] = None,
+                  cancel_token: Optional[CancellationToken] = None) -> RenderResult:
+    """Render a deck straight from a bundle"""
+    try:
+        bundle = read_bundle(source)
+    except BundleError as e:
+        return RenderResult(success=False, error=str(e))
+
+    return render_deck(
+        bundle.question_id,
+        bundle.prompt,
+        bundle.model1,
+        bundle.model2,
+        [image.open() for image in bundle.model1_images],
+        [image.open() for image in bundle.model2_images],
+        bundle.prompt_image.open() if bundle.prompt_image else None,
+        progress_callback=progress_callback,
+        cancel_token=cancel_token
+    )
@@ -0,0 +1,619 @@
+"""Command-line tools for rendering SxS comparison decks without the Streamlit UI.
+
+Batch render every entry of a JSON or CSV manifest on a process pool:
+
+    python sxs_cli.py render manifest.json --output-dir decks/ --workers 4
+
+JSON manifests are a list of jobs (or ``{"jobs": [...]}``); CSV manifests have
+one job per row. Each job has ``question_id``, ``prompt``, ``model1``,
+``model2``, ``model1_images``, ``model2_images`` and optionally
+``prompt_image`` and ``output``. In CSV, image lists are separated by ``;``.
+Relative paths are resolved against the manifest's directory.
+
+Watch a shared folder and render job folders as operators drop them in:
+
+    python sxs_cli.py watch /mnt/sxs-jobs --workers 2
+
+A job folder holds ``metadata.json`` (question_id, prompt, model1, model2 and
+an optional prompt_image file name) plus ``model1/`` and ``model2/`` image
+folders. Once the folder has stopped changing, the PDF is written next to the
+inputs along with a ``.sxs_status.json`` record. The folder is rendered again
+only if its inputs change.
+
+Render decks straight from input bundles exported by the app (see sxs_bundle.py):
+
+    python sxs_cli.py render-bundle audits/*.sxsbundle.zip --output-dir decks/
+
+Reconcile a submissions export against an SOT export (see sxs_question_ids.py):
+
+    python sxs_cli.py reconcile submissions.csv --sot sot.csv --output issues.csv
+
+Serve a local HTTP rendering API (see sxs_http.py for the request format):
+
+    python sxs_cli.py serve --port 8502 --workers 4
+
+Run a local stand-in for the Apps Script webhook (see sxs_webhook_stub.py):
+
+    python sxs_cli.py stub-webhook --port 8503 --storage /tmp/sxs-stub
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from sxs_bundle import BUNDLE_EXTENSION, read_bundle
+from sxs_render import generate_filename, render_deck
+from sxs_question_ids import (
+    build_sot_lookup,
+    parse_question_id_info,
+    read_csv_rows,
+    reconcile_submissions,
+    write_issues_csv,
+)
+
+# ============================================================================
+# CONSTANTS & CONFIGURATION
+# ============================================================================
+
+DEFAULT_WORKERS = 4
+MAX_WORKERS = os.cpu_count() or 1
+CSV_LIST_SEPARATOR = ";"
+
+# Watch-folder configuration
+JOB_METADATA_FILE = "metadata.json"
+JOB_STATUS_FILE = ".sxs_status.json"
+JOB_IMAGE_DIRS = ("model1", "model2")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+DEFAULT_POLL_INTERVAL = 5.0    # seconds between scans
+DEFAULT_SETTLE_SECONDS = 10.0  # inputs must be unchanged this long before rendering
+
+# ============================================================================
+# JOB DEFINITIONS
+# ============================================================================
+
+@dataclass
+class DeckJob:
+    """One deck to render, with screenshots referenced by file path"""
+    question_id: str
+    prompt: str
+    model1: str
+    model2: str
+    model1_images: List[str]
+    model2_images: List[str]
+    prompt_image: Optional[str] = None
+    output: Optional[str] = None
+
+@dataclass
+class JobOutcome:
+    """Result and timings of a rendered DeckJob"""
+    name: str
+    success: bool
+    output_path: str = ""
+    pdf_size: int = 0
+    slide_count: int = 0
+    load_seconds: float = 0.0
+    render_seconds: float = 0.0
+    total_seconds: float = 0.0
+    error: str = ""
+    warnings: List[str] = field(default_factory=list)
+
+def _split_paths(value) -> List[str]:
+    """Accept a list of paths or a CSV cell of separated paths"""
+    if isinstance(value, list):
+        return [str(path).strip() for path in value if str(path).strip()]
+    if not value:
+        return []
+    return [path.strip() for path in str(value).split(CSV_LIST_SEPARATOR) if path.strip()]
+
+def _resolve_path(path: Optional[str], base_dir: str) -> Optional[str]:
+    if not path:
+        return None
+    return path if os.path.isabs(path) else os.path.join(base_dir, path)
+
+def job_from_dict(entry: dict, base_dir: str) -> DeckJob:
+    """Build a DeckJob from a manifest entry, resolving relative paths"""
+    missing = [key for key in ("question_id", "prompt", "model1", "model2") if not entry.get(key)]
+    if missing:
+        raise ValueError(f"Manifest entry is missing required field(s): {', '.join(missing)}")
+
+    return DeckJob(
+        question_id=str(entry["question_id"]).strip(),
+        prompt=str(entry["prompt"]),
+        model1=str(entry["model1"]).strip(),
+        model2=str(entry["model2"]).strip(),
+        model1_images=[_resolve_path(p, base_dir) for p in _split_paths(entry.get("model1_images"))],
+        model2_images=[_resolve_path(p, base_dir) for p in _split_paths(entry.get("model2_images"))],
+        prompt_image=_resolve_path(entry.get("prompt_image") or None, base_dir),
+        output=entry.get("output") or None
+    )
+
+def load_manifest(manifest_path: str) -> List[DeckJob]:
+    """Load deck jobs from a JSON or CSV manifest"""
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+
+    with open(manifest_path, newline="", encoding="utf-8") as manifest_file:
+        if manifest_path.lower().endswith(".csv"):
+            entries = list(csv.DictReader(manifest_file))
+        else:
+            data = json.load(manifest_file)
+            entries = data.get("jobs", []) if isinstance(data, dict) else data
+
+    return [job_from_dict(entry, base_dir) for entry in entries]
+
+# ============================================================================
+# JOB EXECUTION
+# ============================================================================
+
+def run_deck_job(job: DeckJob, output_path: str) -> JobOutcome:
+    """Render one job to output_path; runs inside a pool worker"""
+    start_time = time.perf_counter()
+    outcome = JobOutcome(name=job.question_id, success=False, output_path=output_path)
+    open_files = []
+
+    def open_image(path: str):
+        image_file = open(path, "rb")
+        open_files.append(image_file)
+        return image_file
+
+    try:
+        model1_files = [open_image(path) for path in job.model1_images]
+        model2_files = [open_image(path) for path in job.model2_images]
+        prompt_file = open_image(job.prompt_image) if job.prompt_image else None
+        outcome.load_seconds = time.perf_counter() - start_time
+
+        result = render_deck(
+            job.question_id, job.prompt, job.model1, job.model2,
+            model1_files, model2_files, prompt_file
+        )
+        outcome.render_seconds = result.elapsed_seconds
+        outcome.warnings = result.warnings
+
+        if result.success:
+            os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+            with open(output_path, "wb") as pdf_file:
+                pdf_file.write(result.pdf_bytes)
+            outcome.success = True
+            outcome.pdf_size = len(result.pdf_bytes)
+            outcome.slide_count = 3 + len(model1_files) + len(model2_files)
+        else:
+            outcome.error = result.error.splitlines()[0] if result.error else "Render failed"
+
+    except Exception as e:
+        outcome.error = str(e)
+    finally:
+        for image_file in open_files:
+            image_file.close()
+        outcome.total_seconds = time.perf_counter() - start_time
+
+    return outcome
+
+def default_output_path(job: DeckJob, index: int, output_dir: str) -> str:
+    """Output path for a job; the index keeps same-second filenames unique"""
+    if job.output:
+        return job.output if os.path.isabs(job.output) else os.path.join(output_dir, job.output)
+    return os.path.join(output_dir, f"{index:03d}_{generate_filename(job.model1, job.model2)}")
+
+def run_bundle_job(bundle_path: str, output_path: str) -> JobOutcome:
+    """Render one input bundle to output_path; runs inside a pool worker"""
+    start_time = time.perf_counter()
+    outcome = JobOutcome(name=os.path.basename(bundle_path), success=False, output_path=output_path)
+
+    try:
+        bundle = read_bundle(bundle_path)
+        outcome.name = bundle.question_id
+        outcome.load_seconds = time.perf_counter() - start_time
+
+        result = render_deck(
+            bundle.question_id, bundle.prompt, bundle.model1, bundle.model2,
+            [image.open() for image in bundle.model1_images],
+            [image.open() for image in bundle.model2_images],
+            bundle.prompt_image.open() if bundle.prompt_image else None
+        )
+        outcome.render_seconds = result.elapsed_seconds
+        outcome.warnings = result.warnings
+
+        if result.success:
+            os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+            with open(output_path, "wb") as pdf_file:
+                pdf_file.write(result.pdf_bytes)
+            outcome.success = True
+            outcome.pdf_size = len(result.pdf_bytes)
+            outcome.slide_count = 3 + len(bundle.model1_images) + len(bundle.model2_images)
+        else:
+            outcome.error = result.error.splitlines()[0] if result.error else "Render failed"
+
+    except Exception as e:
+        outcome.error = str(e)
+    finally:
+        outcome.total_seconds = time.perf_counter() - start_time
+
+    return outcome
+
+def bundle_output_path(bundle_path: str, output_dir: str) -> str:
+    """PDF path named after the bundle file"""
+    name = os.path.basename(bundle_path)
+    stem = name[:-len(BUNDLE_EXTENSION)] if name.endswith(BUNDLE_EXTENSION) else os.path.splitext(name)[0]
+    return os.path.join(output_dir, f"{stem}.pdf")
+
+def run_on_pool(submissions: List[tuple], workers: int, on_outcome=None) -> List[JobOutcome]:
+    """Run (name, function, args) submissions on a bounded process pool; outcomes keep submission order"""
+    workers = max(1, min(workers, MAX_WORKERS, len(submissions) or 1))
+    outcomes: List[Optional[JobOutcome]] = [None] * len(submissions)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(function, *args): i
+            for i, (_, function, args) in enumerate(submissions)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                outcome = future.result()
+            except Exception as e:
+                # Worker crashed (e.g. killed) before returning an outcome
+                outcome = JobOutcome(name=submissions[index][0], success=False, error=str(e))
+            outcomes[index] = outcome
+            if on_outcome:
+                on_outcome(index, outcome)
+
+    return outcomes
+
+def render_jobs(jobs: List[DeckJob], output_dir: str, workers: int = DEFAULT_WORKERS,
+                on_outcome=None) -> List[JobOutcome]:
+    """Render jobs on a bounded process pool, returning outcomes in manifest order"""
+    submissions = [
+        (job.question_id, run_deck_job, (job, default_output_path(job, i + 1, output_dir)))
+        for i, job in enumerate(jobs)
+    ]
+    return run_on_pool(submissions, workers, on_outcome)
+
+def render_bundles(bundle_paths: List[str], output_dir: str, workers: int = DEFAULT_WORKERS,
+                   on_outcome=None) -> List[JobOutcome]:
+    """Render input bundles on a bounded process pool, returning outcomes in argument order"""
+    submissions = [
+        (os.path.basename(path), run_bundle_job, (path, bundle_output_path(path, output_dir)))
+        for path in bundle_paths
+    ]
+    return run_on_pool(submissions, workers, on_outcome)
+
+def format_summary(outcomes: List[JobOutcome], wall_seconds: float) -> str:
+    """Per-job timing table plus totals"""
+    lines = [
+        f"{'#':>3}  {'Status':<6}  {'Slides':>6}  {'Load s':>7}  {'Render s':>8}  {'Total s':>7}  {'Size KB':>8}  Job",
+        "-" * 80
+    ]
+    for i, outcome in enumerate(outcomes, 1):
+        status = "OK" if outcome.success else "FAIL"
+        name = outcome.name if len(outcome.name) <= 40 else outcome.name[:37] + "..."
+        lines.append(
+            f"{i:>3}  {status:<6}  {outcome.slide_count:>6}  {outcome.load_seconds:>7.2f}  "
+            f"{outcome.render_seconds:>8.2f}  {outcome.total_seconds:>7.2f}  "
+            f"{outcome.pdf_size / 1024:>8.1f}  {name}"
+        )
+        if outcome.error:
+            lines.append(f"     ❌ {outcome.error}")
+        for warning in outcome.warnings:
+            lines.append(f"     ⚠️ {warning}")
+
+    succeeded = sum(1 for outcome in outcomes if outcome.success)
+    cpu_seconds = sum(outcome.total_seconds for outcome in outcomes)
+    lines.append("-" * 80)
+    lines.append(
+        f"{succeeded}/{len(outcomes)} decks rendered in {wall_seconds:.2f}s wall "
+        f"({cpu_seconds:.2f}s summed job time)"
+    )
+    return "\n".join(lines)
+
+# ============================================================================
+# WATCH FOLDER
+# ============================================================================
+
+def _natural_sort_key(name: str):
+    """Sort names so that shot2.png comes before shot10.png"""
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r"(\d+)", name)]
+
+def _list_images(job_dir: str, subdir: str) -> List[str]:
+    """Image paths in job_dir/subdir, relative to job_dir, in natural order"""
+    folder = os.path.join(job_dir, subdir)
+    if not os.path.isdir(folder):
+        return []
+    names = [name for name in os.listdir(folder) if name.lower().endswith(IMAGE_EXTENSIONS)]
+    return [os.path.join(subdir, name) for name in sorted(names, key=_natural_sort_key)]
+
+def _latest_input_mtime(job_dir: str) -> float:
+    """Newest modification time among a job folder's inputs (outputs excluded)"""
+    latest = 0.0
+    for dirpath, _, filenames in os.walk(job_dir):
+        for name in filenames:
+            if name == JOB_STATUS_FILE or name.lower().endswith(".pdf"):
+                continue
+            latest = max(latest, os.path.getmtime(os.path.join(dirpath, name)))
+    return latest
+
+def _read_job_status(job_dir: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(job_dir, JOB_STATUS_FILE), encoding="utf-8") as status_file:
+            return json.load(status_file)
+    except (OSError, ValueError):
+        return None
+
+def job_from_folder(job_dir: str) -> DeckJob:
+    """Build a DeckJob from a watch-folder job directory"""
+    with open(os.path.join(job_dir, JOB_METADATA_FILE), encoding="utf-8") as metadata_file:
+        metadata = json.load(metadata_file)
+
+    entry = dict(metadata)
+    entry["model1_images"] = _list_images(job_dir, JOB_IMAGE_DIRS[0])
+    entry["model2_images"] = _list_images(job_dir, JOB_IMAGE_DIRS[1])
+    return job_from_dict(entry, job_dir)
+
+def find_ready_job_dirs(root: str, settle_seconds: float) -> List[str]:
+    """Job folders that are complete, settled and not yet rendered for their current inputs"""
+    ready = []
+    now = time.time()
+
+    for dirpath, dirnames, filenames in os.walk(root):
+        if JOB_METADATA_FILE not in filenames:
+            continue
+        # A job folder's model1/ and model2/ are inputs, not nested jobs
+        dirnames[:] = [name for name in dirnames if name not in JOB_IMAGE_DIRS]
+
+        if not all(os.path.isdir(os.path.join(dirpath, name)) for name in JOB_IMAGE_DIRS):
+            continue
+
+        latest_mtime = _latest_input_mtime(dirpath)
+        if now - latest_mtime < settle_seconds:
+            continue  # Still being copied in
+
+        status = _read_job_status(dirpath)
+        if status and status.get("input_mtime", 0) >= latest_mtime:
+            continue  # Already rendered (or failed) for these exact inputs
+
+        ready.append(dirpath)
+
+    return sorted(ready)
+
+def _write_job_status(job_dir: str, outcome: JobOutcome, input_mtime: float):
+    status = {
+        "success": outcome.success,
+        "output": os.path.basename(outcome.output_path) if outcome.success else "",
+        "error": outcome.error,
+        "warnings": outcome.warnings,
+        "render_seconds": round(outcome.render_seconds, 3),
+        "rendered_at": datetime.now().isoformat(),
+        "input_mtime": input_mtime
+    }
+    with open(os.path.join(job_dir, JOB_STATUS_FILE), "w", encoding="utf-8") as status_file:
+        json.dump(status, status_file, indent=2)
+
+def watch_folder(root: str, workers: int = DEFAULT_WORKERS,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 settle_seconds: float = DEFAULT_SETTLE_SECONDS,
+                 once: bool = False):
+    """Poll root for ready job folders and render them on a long-lived worker pool.
+    
+    The pool is created once, so jobs never pay interpreter start-up or import
+    costs. With once=True, returns after the first scan's jobs have finished.
+    """
+    workers = max(1, min(workers, MAX_WORKERS))
+    in_flight = {}  # future -> (job_dir, input_mtime)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        try:
+            while True:
+                busy_dirs = {job_dir for job_dir, _ in in_flight.values()}
+                for job_dir in find_ready_job_dirs(root, settle_seconds):
+                    if job_dir in busy_dirs:
+                        continue
+                    input_mtime = _latest_input_mtime(job_dir)
+                    try:
+                        job = job_from_folder(job_dir)
+                    except Exception as e:
+                        outcome = JobOutcome(name=job_dir, success=False, error=f"Invalid job folder: {e}")
+                        _write_job_status(job_dir, outcome, input_mtime)
+                        print(f"❌ {job_dir}: {outcome.error}")
+                        continue
+
+                    output_path = os.path.join(job_dir, generate_filename(job.model1, job.model2))
+                    future = executor.submit(run_deck_job, job, output_path)
+                    in_flight[future] = (job_dir, input_mtime)
+                    print(f"🖨️ Queued {job_dir}")
+
+                for future in [f for f in in_flight if f.done()]:
+                    job_dir, input_mtime = in_flight.pop(future)
+                    try:
+                        outcome = future.result()
+                    except Exception as e:
+                        outcome = JobOutcome(name=job_dir, success=False, error=str(e))
+                    _write_job_status(job_dir, outcome, input_mtime)
+                    status = "✅" if outcome.success else "❌"
+                    detail = f"{outcome.total_seconds:.2f}s" if outcome.success else outcome.error
+                    print(f"{status} {job_dir} ({detail})")
+
+                if once and not in_flight:
+                    return
+                time.sleep(poll_interval if not once else 0.1)
+
+        except KeyboardInterrupt:
+            print("Stopping watcher; cancelling queued jobs...")
+            for future in in_flight:
+                future.cancel()
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def cmd_render(args) -> int:
+    jobs = load_manifest(args.manifest)
+    if not jobs:
+        print("Manifest contains no jobs")
+        return 1
+
+    output_dir = args.output_dir or os.path.dirname(os.path.abspath(args.manifest))
+    print(f"Rendering {len(jobs)} deck(s) with up to {min(args.workers, MAX_WORKERS)} worker(s)...")
+
+    def on_outcome(index: int, outcome: JobOutcome):
+        status = "✅" if outcome.success else "❌"
+        print(f"{status} [{index + 1}/{len(jobs)}] {outcome.name[:60]} ({outcome.total_seconds:.2f}s)")
+
+    start_time = time.perf_counter()
+    outcomes = render_jobs(jobs, output_dir, args.workers, on_outcome)
+    print()
+    print(format_summary(outcomes, time.perf_counter() - start_time))
+
+    return 0 if all(outcome.success for outcome in outcomes) else 2
+
+def cmd_render_bundle(args) -> int:
+    output_dir = args.output_dir or os.getcwd()
+    print(f"Rendering {len(args.bundles)} bundle(s) with up to {min(args.workers, MAX_WORKERS)} worker(s)...")
+
+    def on_outcome(index: int, outcome: JobOutcome):
+        status = "✅" if outcome.success else "❌"
+        print(f"{status} [{index + 1}/{len(args.bundles)}] {outcome.name[:60]} ({outcome.total_seconds:.2f}s)")
+
+    start_time = time.perf_counter()
+    outcomes = render_bundles(args.bundles, output_dir, args.workers, on_outcome)
+    print()
+    print(format_summary(outcomes, time.perf_counter() - start_time))
+
+    return 0 if all(outcome.success for outcome in outcomes) else 2
+
+def cmd_watch(args) -> int:
+    if not os.path.isdir(args.root):
+        print(f"Not a directory: {args.root}")
+        return 1
+
+    print(f"Watching {args.root} every {args.interval:g}s with {min(args.workers, MAX_WORKERS)} worker(s)...")
+    watch_folder(args.root, args.workers, args.interval, args.settle, once=args.once)
+    return 0
+
+def cmd_reconcile(args) -> int:
+    start_time = time.perf_counter()
+    submissions = read_csv_rows(args.submissions)
+    sot_lookup = build_sot_lookup(read_csv_rows(args.sot))
+    issues = reconcile_submissions(submissions, sot_lookup)
+    elapsed = time.perf_counter() - start_time
+
+    counts = {}
+    for issue in issues:
+        counts[issue["issue"]] = counts.get(issue["issue"], 0) + 1
+
+    cache = parse_question_id_info.cache_info()
+    print(f"Checked {len(submissions)} submission(s) against {len(sot_lookup)} SOT task(s) in {elapsed:.2f}s "
+          f"({cache.currsize} unique Question IDs)")
+    for issue_name, count in sorted(counts.items()):
+        print(f"❌ {issue_name}: {count}")
+    if not issues:
+        print("✅ No issues found")
+
+    if args.output:
+        write_issues_csv(issues, args.output)
+        print(f"Report written to {args.output}")
+
+    return 0 if not issues else 2
+
+def cmd_serve(args) -> int:
+    # Imported here so render/watch runs never load the HTTP stack
+    from sxs_http import create_server
+
+    server = create_server(args.host, args.port, max(1, min(args.workers, MAX_WORKERS)), args.max_pending)
+    print(f"Serving POST http://{args.host}:{args.port}/render with {server.service.workers} worker(s)...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Shutting down...")
+    finally:
+        server.server_close()
+        server.service.shutdown()
+    return 0
+
+def cmd_stub_webhook(args) -> int:
+    # Imported here so other commands never load the stub
+    from sxs_webhook_stub import create_stub_server, load_backend
+
+    backend = load_backend(args.storage, args.alias_emails, args.company_domain, args.sot)
+    server = create_stub_server(args.host, args.port, backend, args.fail_rate, args.drop_rate, args.verbose)
+    print(f"Stub webhook on {backend.base_url}/ storing files in {args.storage}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Shutting down...")
+    finally:
+        server.server_close()
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Render SxS comparison PDFs without the Streamlit UI")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    render_parser = subparsers.add_parser("render", help="Render every deck in a JSON or CSV manifest")
+    render_parser.add_argument("manifest", help="Path to a .json or .csv manifest")
+    render_parser.add_argument("-o", "--output-dir", help="Where to write PDFs (default: manifest directory)")
+    render_parser.add_argument("-w", "--workers", type=int, default=DEFAULT_WORKERS,
+                               help=f"Worker processes, capped at CPU count (default: {DEFAULT_WORKERS})")
+    render_parser.set_defaults(func=cmd_render)
+
+    bundle_parser = subparsers.add_parser("render-bundle", help="Render decks from input bundles exported by the app")
+    bundle_parser.add_argument("bundles", nargs="+", help="Bundle zip files")
+    bundle_parser.add_argument("-o", "--output-dir", help="Where to write PDFs (default: current directory)")
+    bundle_parser.add_argument("-w", "--workers", type=int, default=DEFAULT_WORKERS,
+                               help=f"Worker processes, capped at CPU count (default: {DEFAULT_WORKERS})")
+    bundle_parser.set_defaults(func=cmd_render_bundle)
+
+    watch_parser = subparsers.add_parser("watch", help="Render job folders dropped into a directory tree")
+    watch_parser.add_argument("root", help="Directory tree to poll for job folders")
+    watch_parser.add_argument("-w", "--workers", type=int, default=DEFAULT_WORKERS,
+                              help=f"Worker processes, capped at CPU count (default: {DEFAULT_WORKERS})")
+    watch_parser.add_argument("--interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                              help=f"Seconds between scans (default: {DEFAULT_POLL_INTERVAL:g})")
+    watch_parser.add_argument("--settle", type=float, default=DEFAULT_SETTLE_SECONDS,
+                              help=f"Seconds a folder must be unchanged before rendering (default: {DEFAULT_SETTLE_SECONDS:g})")
+    watch_parser.add_argument("--once", action="store_true", help="Render what is ready now, then exit")
+    watch_parser.set_defaults(func=cmd_watch)
+
+    reconcile_parser = subparsers.add_parser("reconcile", help="Check a submissions export against an SOT export")
+    reconcile_parser.add_argument("submissions", help="Submissions CSV (needs a Question ID column)")
+    reconcile_parser.add_argument("--sot", required=True,
+                                  help="SOT CSV with Task ID, Language, Project Type and Model Comparison columns")
+    reconcile_parser.add_argument("-o", "--output", help="Write every issue to this CSV")
+    reconcile_parser.set_defaults(func=cmd_reconcile)
+
+    serve_parser = subparsers.add_parser("serve", help="Serve a local HTTP rendering API")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    serve_parser.add_argument("--port", type=int, default=8502, help="Port to listen on (default: 8502)")
+    serve_parser.add_argument("-w", "--workers", type=int, default=DEFAULT_WORKERS,
+                              help=f"Worker processes, capped at CPU count (default: {DEFAULT_WORKERS})")
+    serve_parser.add_argument("--max-pending", type=int, default=8,
+                              help="Requests allowed to wait for a worker before returning 503 (default: 8)")
+    serve_parser.set_defaults(func=cmd_serve)
+
+    stub_parser = subparsers.add_parser("stub-webhook", help="Run a local stand-in for the Apps Script webhook")
+    stub_parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    stub_parser.add_argument("--port", type=int, default=8503, help="Port to listen on (default: 8503)")
+    stub_parser.add_argument("--storage", default="sxs_stub_storage", help="Folder for uploaded PDFs and logged submissions")
+    stub_parser.add_argument("--alias-emails", help="File with one authorized email per line (default: accept all)")
+    stub_parser.add_argument("--company-domain", default="",
+                             help="Domain accepted after repeated attempts (company fallback)")
+    stub_parser.add_argument("--sot", help="SOT CSV used by validate_question_id (default: accept all)")
+    stub_parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    stub_parser.add_argument("--drop-rate", type=float, default=0.0,
+                             help="Fraction of requests processed but left without a reply")
+    stub_parser.add_argument("--verbose", action="store_true", help="Log every request")
+    stub_parser.set_defaults(func=cmd_stub_webhook)
+
+    return parser
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
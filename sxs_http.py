@@ -0,0 +1,237 @@
+"""Local HTTP rendering API for SxS comparison decks (stdlib only).
+
+Start it through the CLI:
+
+    python sxs_cli.py serve --port 8502 --workers 4
+
+``POST /render`` takes ``multipart/form-data`` with the text fields
+``question_id``, ``prompt``, ``model1`` and ``model2``, the repeated file fields
+``model1_images`` and ``model2_images`` (slide order follows upload order), and
+an optional ``prompt_image`` file. The response is the PDF itself. Timing comes
+back in ``X-Queue-Seconds``, ``X-Render-Seconds``, ``X-Total-Seconds`` and
+``Server-Timing`` headers. ``GET /health`` reports pool status.
+
+Request threads only parse uploads and stream responses. Rendering runs on a
+shared process pool, and a bounded number of requests may wait for it;
+requests beyond that get 503.
+"""
+
+import io
+import json
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+from sxs_render import RenderResult, generate_filename, render_deck
+
+# ============================================================================
+# CONSTANTS & CONFIGURATION
+# ============================================================================
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8502
+DEFAULT_MAX_PENDING = 8
+MAX_REQUEST_BYTES = 200 * 1024 * 1024  # Matches server.maxUploadSize in config.toml
+STREAM_CHUNK_BYTES = 64 * 1024
+REQUIRED_FIELDS = ("question_id", "prompt", "model1", "model2")
+
+# ============================================================================
+# MULTIPART PARSING
+# ============================================================================
+
+def parse_multipart(content_type: str, body: bytes) -> Tuple[Dict[str, str], Dict[str, List[Tuple[str, bytes]]]]:
+    """Split a multipart/form-data body into text fields and uploaded files.
+
+    Files keep the order they appear in the body, which is the slide order.
+    """
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + body
+    )
+    if not message.is_multipart():
+        raise ValueError("Expected a multipart/form-data body")
+
+    fields: Dict[str, str] = {}
+    files: Dict[str, List[Tuple[str, bytes]]] = {}
+
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        if not name:
+            continue
+        payload = part.get_payload(decode=True) or b""
+        filename = part.get_filename()
+        if filename is not None:
+            files.setdefault(name, []).append((filename, payload))
+        else:
+            fields[name] = payload.decode(part.get_content_charset() or "utf-8")
+
+    return fields, files
+
+# ============================================================================
+# RENDER SERVICE
+# ============================================================================
+
+class RenderService:
+    """Process pool shared by every request thread, with bounded admission"""
+
+    def __init__(self, workers: int, max_pending: int = DEFAULT_MAX_PENDING):
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._lock = threading.Lock()
+        self.active_requests = 0
+        self.completed_requests = 0
+
+    def try_acquire(self) -> bool:
+        """Reserve a render slot without blocking; False means overloaded"""
+        if not self._slots.acquire(blocking=False):
+            return False
+        with self._lock:
+            self.active_requests += 1
+        return True
+
+    def release(self):
+        with self._lock:
+            self.active_requests -= 1
+            self.completed_requests += 1
+        self._slots.release()
+
+    def render(self, fields: Dict[str, str], files: Dict[str, List[Tuple[str, bytes]]]) -> Tuple[RenderResult, float]:
+        """Render on the pool; returns the result and the time spent waiting for a worker"""
+        prompt_files = files.get("prompt_image", [])
+        submitted_at = time.perf_counter()
+        try:
+            future = self.executor.submit(
+                render_deck,
+                fields["question_id"],
+                fields["prompt"],
+                fields["model1"],
+                fields["model2"],
+                [io.BytesIO(data) for _, data in files.get("model1_images", [])],
+                [io.BytesIO(data) for _, data in files.get("model2_images", [])],
+                io.BytesIO(prompt_files[0][1]) if prompt_files and prompt_files[0][1] else None
+            )
+            result = future.result()
+        except Exception as e:
+            # The pool itself failed (crashed worker, pickling error): render_deck reports everything else
+            result = RenderResult(success=False, error=f"Render worker failed: {type(e).__name__}: {e}")
+        waited = time.perf_counter() - submitted_at
+        return result, max(0.0, waited - result.elapsed_seconds)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+# ============================================================================
+# HTTP HANDLER
+# ============================================================================
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    """Routes /health and /render; self.server.service is the RenderService"""
+
+    server_version = "SxSRender/1.0"
+
+    def _send_json(self, status: int, payload: dict, extra_headers: Dict[str, str] = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for header, value in (extra_headers or {}).items():
+            self.send_header(header, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/") != "/health":
+            self._send_json(404, {"success": False, "message": "Not found"})
+            return
+
+        service = self.server.service
+        self._send_json(200, {
+            "success": True,
+            "data": {
+                "workers": service.workers,
+                "active_requests": service.active_requests,
+                "completed_requests": service.completed_requests
+            }
+        })
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/render":
+            self._send_json(404, {"success": False, "message": "Not found"})
+            return
+
+        request_start = time.perf_counter()
+        content_length = int(self.headers.get("Content-Length") or 0)
+        if content_length <= 0:
+            self._send_json(411, {"success": False, "message": "Content-Length required"})
+            return
+        if content_length > MAX_REQUEST_BYTES:
+            self._send_json(413, {"success": False, "message": f"Request exceeds {MAX_REQUEST_BYTES // (1024 * 1024)}MB"})
+            return
+
+        service = self.server.service
+        if not service.try_acquire():
+            self._send_json(503, {"success": False, "message": "Render queue is full, retry shortly"},
+                            {"Retry-After": "5"})
+            return
+
+        try:
+            body = self.rfile.read(content_length)
+            try:
+                fields, files = parse_multipart(self.headers.get("Content-Type", ""), body)
+            except Exception as e:
+                self._send_json(400, {"success": False, "message": f"Invalid multipart body: {e}"})
+                return
+            parse_seconds = time.perf_counter() - request_start
+
+            missing = [name for name in REQUIRED_FIELDS if not fields.get(name, "").strip()]
+            if missing:
+                self._send_json(400, {"success": False, "message": f"Missing field(s): {', '.join(missing)}"})
+                return
+
+            result, queue_seconds = service.render(fields, files)
+            total_seconds = time.perf_counter() - request_start
+            timing_headers = {
+                "X-Queue-Seconds": f"{queue_seconds:.3f}",
+                "X-Render-Seconds": f"{result.elapsed_seconds:.3f}",
+                "X-Total-Seconds": f"{total_seconds:.3f}",
+                "Server-Timing": (
+                    f"parse;dur={parse_seconds * 1000:.1f}, queue;dur={queue_seconds * 1000:.1f}, "
+                    f"render;dur={result.elapsed_seconds * 1000:.1f}"
+                )
+            }
+
+            if not result.success:
+                self._send_json(500, {
+                    "success": False,
+                    "message": result.error.splitlines()[0] if result.error else "Render failed",
+                    "data": {"warnings": result.warnings}
+                }, timing_headers)
+                return
+
+            filename = generate_filename(fields["model1"], fields["model2"])
+            self.send_response(200)
+            self.send_header("Content-Type", "application/pdf")
+            self.send_header("Content-Length", str(len(result.pdf_bytes)))
+            self.send_header("Content-Disposition", f'attachment; filename="{filename}"')
+            self.send_header("X-Render-Warnings", str(len(result.warnings)))
+            for header, value in timing_headers.items():
+                self.send_header(header, value)
+            self.end_headers()
+
+            view = memoryview(result.pdf_bytes)
+            for offset in range(0, len(view), STREAM_CHUNK_BYTES):
+                self.wfile.write(view[offset:offset + STREAM_CHUNK_BYTES])
+
+        finally:
+            service.release()
+
+def create_server(host: str, port: int, workers: int, max_pending: int = DEFAULT_MAX_PENDING) -> ThreadingHTTPServer:
+    """Build the HTTP server; call serve_forever() and later server.service.shutdown()"""
+    server = ThreadingHTTPServer((host, port), RenderRequestHandler)
+    server.daemon_threads = True
+    server.service = RenderService(workers, max_pending)
+    return server
@@ -0,0 +1,156 @@
+"""Durable local outbox for submission logging (no Streamlit).
+
+Submissions are written to a SQLite file first, and the user is acknowledged
+right away. A background thread then sends pending rows to the webhook in
+batches:
+
+    log_submissions  {submissions: [{submission_id, ...form_data}, ...]}
+                     -> data.accepted: [submission_id, ...]
+
+Each submission's ``submission_id`` is the hash of its content. Double
+clicks and retried sends are therefore collapsed locally (UNIQUE column), and
+the webhook can ignore ids it has already written. Failed sends are retried
+with exponential backoff and stay on disk across restarts until they are
+accepted. If a webhook deployment does not support ``log_submissions``, rows
+are sent one by one with ``log_submission``.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+# ============================================================================
+# CONSTANTS & CONFIGURATION
+# ============================================================================
+
+OUTBOX_BATCH_SIZE = 25
+OUTBOX_FLUSH_INTERVAL = 2.0        # Seconds between flushes when nothing new arrives
+OUTBOX_RETRY_BASE_SECONDS = 5.0
+OUTBOX_RETRY_MAX_SECONDS = 300.0
+OUTBOX_RETENTION_SECONDS = 7 * 24 * 60 * 60  # Sent rows are kept this long for auditing
+
+OUTBOX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    submission_id TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT NOT NULL DEFAULT '',
+    sent_at REAL
+);
+CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (sent_at, next_attempt_at);
+"""
+
+def submission_id_for(form_data: dict) -> str:
+    """Stable id for a submission: the hash of its canonical JSON"""
+    canonical = json.dumps(form_data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+# ============================================================================
+# OUTBOX
+# ============================================================================
+
+class SubmissionOutbox:
+    """SQLite-backed queue flushed to the webhook by a background thread"""
+
+    def __init__(self, db_path: str, client, batch_size: int = OUTBOX_BATCH_SIZE,
+                 flush_interval: float = OUTBOX_FLUSH_INTERVAL):
+        self.db_path = db_path
+        self.client = client  # AppsScriptClient
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._db_lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(OUTBOX_SCHEMA)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._flush_lock = threading.Lock()
+        self.last_flush_error = ""
+
+    def start(self):
+        """Start the background flusher (idempotent)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="sxs-outbox-flusher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def enqueue(self, form_data: dict) -> Tuple[str, bool]:
+        """Store a submission durably; returns (submission_id, newly_added)"""
+        submission_id = submission_id_for(form_data)
+        now = time.time()
+        with self._db_lock:
+            cursor = self._connection.execute(
+                "INSERT OR IGNORE INTO outbox (submission_id, payload, created_at, next_attempt_at) VALUES (?, ?, ?, ?)",
+                (submission_id, json.dumps(form_data, default=str), now, now)
+            )
+        self._wake.set()
+        return submission_id, cursor.rowcount == 1
+
+    def stats(self) -> Dict[str, object]:
+        """Counts for display: pending, failing (retried at least once), sent, last_error"""
+        with self._db_lock:
+            pending, failing = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(attempts > 0), 0) FROM outbox WHERE sent_at IS NULL"
+            ).fetchone()
+            sent = self._connection.execute("SELECT COUNT(*) FROM outbox WHERE sent_at IS NOT NULL").fetchone()[0]
+        return {"pending": pending, "failing": failing, "sent": sent, "last_error": self.last_flush_error}
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                while self.flush_once() == self.batch_size:
+                    pass  # Full batch: more may be waiting
+            except Exception as e:
+                self.last_flush_error = str(e)
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+
+    def flush_once(self) -> int:
+        """Send one batch of due submissions; returns how many were attempted"""
+        with self._flush_lock:
+            now = time.time()
+            with self._db_lock:
+                rows = self._connection.execute(
+                    "SELECT id, submission_id, payload, attempts FROM outbox "
+                    "WHERE sent_at IS NULL AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                    (now, self.batch_size)
+                ).fetchall()
+                self._connection.execute(
+                    "DELETE FROM outbox WHERE sent_at IS NOT NULL AND sent_at < ?",
+                    (now - OUTBOX_RETENTION_SECONDS,)
+                )
+            if not rows:
+                return 0
+
+            batch = [{"submission_id": submission_id, **json.loads(payload)} for _, submission_id, payload, _ in rows]
+            accepted, error = self.client.log_submissions(batch)
+            self.last_flush_error = error
+
+            sent_at = time.time()
+            with self._db_lock:
+                self._connection.execute("BEGIN")
+                for row_id, submission_id, _, attempts in rows:
+                    if submission_id in accepted:
+                        self._connection.execute("UPDATE outbox SET sent_at = ?, last_error = '' WHERE id = ?",
+                                                 (sent_at, row_id))
+                    else:
+                        delay = min(OUTBOX_RETRY_MAX_SECONDS, OUTBOX_RETRY_BASE_SECONDS * (2 ** attempts))
+                        self._connection.execute(
+                            "UPDATE outbox SET attempts = attempts + 1, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                            (sent_at + delay, error or "Not accepted", row_id)
+                        )
+                self._connection.execute("COMMIT")
+            return len(rows)
@@ -1,23 +1,31 @@
 import streamlit as st
 import io
+import os
 import base64
 import re
-import requests
-import json
 import html
-from PIL import Image, ImageDraw
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
-from reportlab.lib.units import inch
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.lib.colors import HexColor
 from datetime import datetime
-import tempfile
-import os
 import traceback
-from typing import List, Optional, BinaryIO, Tuple
-import time
+from typing import List, Optional, BinaryIO, Tuple, Callable
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from sxs_render import (
+    PDFGenerator,
+    CancellationToken,
+    GenerationCancelled,
+    ProgressEvent,
+    build_slide_preview_plan,
+    generate_filename,
+    get_content_fingerprint,
+    make_image_thumbnail,
+    render_slide_png,
+)
+from sxs_webhook import AppsScriptClient, TTLCache
+from sxs_outbox import SubmissionOutbox
+from sxs_snapshots import RosterSnapshot, SotIndex
+from sxs_question_ids import extract_task_id_from_question_id, parse_model_combination
+from sxs_bundle import BUNDLE_EXTENSION, BundleError, BundleImage, SxsBundle, bundle_to_bytes, read_bundle
 
 # Configure page
 st.set_page_config(
@@ -31,13 +39,32 @@ st.set_page_config(
 # CONSTANTS & CONFIGURATION
 # ============================================================================
 
-# Google Apps Script Webhook Configuration
-WEBHOOK_URL = st.secrets.get("webhook_url", "")
-WEBHOOK_TIMEOUT = 30
+# Local SQLite files live in the data directory (secret data_dir or SXS_DATA_DIR), never the working directory
+DEFAULT_DATA_DIR = os.path.join(os.path.expanduser("~"), ".sxs-pdf-generator")
+# Local submission outbox (SQLite), flushed to the webhook in the background
+DEFAULT_OUTBOX_FILENAME = "sxs_outbox.sqlite3"
+DEFAULT_SOT_INDEX_FILENAME = "sxs_sot_index.sqlite3"
+PREFETCH_WORKERS = 4  # Background lookups started while the user is still typing
+PREFETCH_WAIT_SECONDS = 10.0  # Longer than this, Save Metadata makes its own SOT check
+SPECULATIVE_UPLOAD_WORKERS = 2  # Background Drive uploads started right after generation
+
+# Email validation results shared by all sessions (seconds)
+EMAIL_VALIDATION_TTL_SECONDS = 10 * 60
+EMAIL_NEGATIVE_TTL_SECONDS = 60
 
 MAX_FILE_SIZE_MB = 50
 MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
 
+# Progress bar span for each generate_pdf stage (start, end)
+PROGRESS_STAGE_RANGES = {
+    "prepared": (0.0, 0.5),
+    "drawn": (0.5, 0.95),
+    "saved": (0.95, 1.0),
+}
+
+# Slide preview configuration
+PREVIEW_COLUMNS = 4
+
 # Model configurations
 MODEL_CONFIGS = {
     "Gemini": {
@@ -318,238 +345,76 @@ st.markdown("""
 # GOOGLE APPS SCRIPT INTEGRATION
 # ============================================================================
 
-class AppsScriptClient:
-    """Client for Google Apps Script webhook integration"""
-    
-    def __init__(self, webhook_url: str):
-        self.webhook_url = webhook_url
-        self.is_connected = False
-        self.last_test = None
-    
-    def test_connection(self) -> dict:
-        """Test connection to Google Apps Script webhook"""
-        try:
-            if not self.webhook_url:
-                return {"success": False, "message": "Webhook URL not configured"}
-                
-            response = requests.post(
-                self.webhook_url,
-                json={"action": "test_connection"},
-                timeout=WEBHOOK_TIMEOUT
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                self.is_connected = result.get("success", False)
-                self.last_test = datetime.now()
-                return result
-            else:
-                self.is_connected = False
-                return {"success": False, "message": f"HTTP {response.status_code}"}
-                
-        except Exception as e:
-            self.is_connected = False
-            return {"success": False, "message": f"Connection error: {str(e)}"}
-    
-    def validate_email(self, email: str, attempt_count: int = 1) -> dict:
-        """Validate email against Alias Emails spreadsheet"""
-        try:
-            if not self.webhook_url:
-                return {"success": False, "message": "Webhook URL not configured"}
-                
-            response = requests.post(
-                self.webhook_url,
-                json={
-                    "action": "validate_email",
-                    "email": email,
-                    "attempt_count": attempt_count
-                },
-                timeout=WEBHOOK_TIMEOUT
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return {"success": False, "message": f"Validation request failed: HTTP {response.status_code}"}
-                
-        except Exception as e:
-            return {"success": False, "message": f"Email validation error: {str(e)}"}
-        
-    def validate_question_id(self, question_id: str) -> dict:
-        """Validate Question ID against spreadsheet SOT"""
-        try:
-            if not self.webhook_url:
-                return {"success": True, "message": "Question ID accepted", "data": {"is_valid": True}}
-                
-            response = requests.post(
-                self.webhook_url,
-                json={
-                    "action": "validate_question_id",
-                    "question_id": question_id
-                },
-                timeout=WEBHOOK_TIMEOUT
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return {"success": True, "message": "Question ID accepted", "data": {"is_valid": True}}
-                
-        except Exception:
-            return {"success": True, "message": "Question ID accepted", "data": {"is_valid": True}}
-    
-    def upload_pdf(self, pdf_buffer: io.BytesIO, filename: str, metadata: dict) -> dict:
-        """Upload PDF to Google Drive"""
-        try:
-            if not self.webhook_url:
-                return {"success": False, "message": "Upload service unavailable"}
-            
-            pdf_buffer.seek(0)
-            pdf_data = pdf_buffer.read()
-            
-            # Check file size
-            if len(pdf_data) > MAX_FILE_SIZE_BYTES:
-                return {"success": False, "message": f"File too large. Maximum size is {MAX_FILE_SIZE_MB}MB"}
-            
-            pdf_base64 = base64.b64encode(pdf_data).decode('utf-8')
-            
-            response = requests.post(
-                self.webhook_url,
-                json={
-                    "action": "upload_pdf",
-                    "pdf_base64": pdf_base64,
-                    "filename": filename,
-                    "metadata": metadata
-                },
-                timeout=WEBHOOK_TIMEOUT
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return {"success": False, "message": "Upload failed"}
-                
-        except Exception as e:
-            return {"success": False, "message": f"Upload service error: {str(e)}"}
-    
-    def log_submission(self, form_data: dict) -> dict:
-        """Log form submission to spreadsheet"""
-        try:
-            if not self.webhook_url:
-                return {"success": True}
-                
-            response = requests.post(
-                self.webhook_url,
-                json={
-                    "action": "log_submission",
-                    **form_data
-                },
-                timeout=WEBHOOK_TIMEOUT
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return {"success": True}
-                
-        except Exception:
-            return {"success": True}
+def get_webhook_url() -> str:
+    """Read the webhook URL from Streamlit secrets"""
+    return st.secrets.get("webhook_url", "")
+
+def get_local_db_path(path_secret: str, filename: str) -> str:
+    """Path of a local SQLite file: its own secret, else the filename in the data directory"""
+    if st.secrets.get(path_secret):
+        return st.secrets[path_secret]
+    data_dir = st.secrets.get("data_dir") or os.environ.get("SXS_DATA_DIR") or DEFAULT_DATA_DIR
+    os.makedirs(data_dir, exist_ok=True)
+    return os.path.join(data_dir, filename)
 
 @st.cache_resource
 def get_apps_script_client():
-    """Get cached AppsScript client instance"""
-    return AppsScriptClient(WEBHOOK_URL)
+    """Get cached AppsScript client instance (built on first use)"""
+    return AppsScriptClient(get_webhook_url(), max_upload_bytes=MAX_FILE_SIZE_BYTES)
 
-apps_script = get_apps_script_client()
+@st.cache_resource
+def get_email_validation_cache():
+    """Email validation verdicts shared by all sessions, keyed by normalized email"""
+    return TTLCache(EMAIL_VALIDATION_TTL_SECONDS, max_entries=4096)
+
+@st.cache_resource
+def get_roster_snapshot():
+    """Get the shared authorized-email snapshot and start its background refresh"""
+    roster = RosterSnapshot(get_apps_script_client())
+    roster.start()
+    return roster
+
+@st.cache_resource
+def get_sot_index() -> Optional[SotIndex]:
+    """Get the shared persisted SOT index and start its background refresh (None without a webhook)"""
+    if not get_webhook_url():
+        return None
+    sot_index = SotIndex(get_local_db_path("sot_index_path", DEFAULT_SOT_INDEX_FILENAME), get_apps_script_client())
+    sot_index.start()
+    return sot_index
+
+@st.cache_resource
+def get_prefetch_executor():
+    """Thread pool shared by all sessions for background SOT lookups"""
+    return ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="sxs-prefetch")
+
+@st.cache_resource
+def get_upload_executor():
+    """Thread pool for speculative Drive uploads, separate so long uploads never delay lookups"""
+    return ThreadPoolExecutor(max_workers=SPECULATIVE_UPLOAD_WORKERS, thread_name_prefix="sxs-upload")
+
+@st.cache_resource
+def get_submission_outbox() -> Optional[SubmissionOutbox]:
+    """Get the shared submission outbox and start its background flusher (None without a webhook)"""
+    if not get_webhook_url():
+        return None
+    outbox = SubmissionOutbox(get_local_db_path("outbox_path", DEFAULT_OUTBOX_FILENAME), get_apps_script_client())
+    outbox.start()
+    return outbox
 
 # ============================================================================
 # INTEGRATION FUNCTIONS - FIXED
 # ============================================================================
 
-def parse_question_id(question_id: str) -> Tuple[Optional[str], Optional[str]]:
-    """Parse Question ID to extract language and project type using regex patterns"""
-    language = None
-    project_type = None
-    
-    try:
-        # Extract language pattern
-        language_pattern = r'human_eval_([a-z]{2}-[A-Z]{2}|[a-z]{2}-\d{3}|[a-z]{2}-[a-z]{2})\+INTERNAL'
-        language_match = re.search(language_pattern, question_id)
-        
-        if language_match:
-            language = language_match.group(1)
-        
-        # Extract project type
-        project_type_mapping = {
-            'monolingual': 'Monolingual',
-            'audio_out': 'Audio Out',
-            'mixed': 'Mixed',
-            'code_mixed': 'Mixed',
-            'language_learning': 'Language Learning',
-            'learning_and_academic_help': 'Learning & Academic Help'
-        }
-        
-        project_pattern = r'experience_([a-z_]+)_human_eval'
-        project_match = re.search(project_pattern, question_id)
-        
-        if project_match:
-            extracted_project = project_match.group(1)
-            for key, value in project_type_mapping.items():
-                if key in extracted_project:
-                    project_type = value
-                    break
-        
-    except Exception as e:
-        print(f"Error parsing Question ID: {e}")
-    
-    return language, project_type
+def note_rate_limit_wait(waited: float):
+    """Add a rate-limit wait measured on a background thread to this session's next report"""
+    st.session_state.rate_limit_waited = st.session_state.get('rate_limit_waited', 0.0) + waited
 
-def extract_task_id_from_question_id(question_id: str) -> Optional[str]:
-    """Extract Task ID from Question ID using pattern matching"""
-    try:
-        # Pattern: {hash}+bard_data+{TASK_ID}+INTERNAL+en:{number}
-        pattern = r'bard_data\+([^+]+)\+INTERNAL'
-        match = re.search(pattern, question_id)
-        
-        if match and match[1]:
-            return match[1].strip()
-        
-        # Fallback patterns
-        alt_patterns = [
-            r'bard_data\+([^+]+)\+',       # Lenient pattern
-            r'coach_P\d+[^+]+',           # coach_P pattern matching
-        ]
-        
-        for alt_pattern in alt_patterns:
-            alt_match = re.search(alt_pattern, question_id)
-            if alt_match:
-                return alt_match[0].replace('bard_data+', '').replace('+', '').strip()
-        
-        return None
-    except Exception as e:
-        print(f"Error extracting Task ID: {e}")
-        return None
-
-def parse_model_combination(model_comparison: str) -> Tuple[Optional[str], Optional[str]]:
-    """Parse model combination string into individual models"""
-    try:
-        if not model_comparison:
-            return None, None
-        
-        # Common patterns: "Model1 vs Model2", "Model1 vs. Model2"
-        if " vs " in model_comparison:
-            parts = model_comparison.split(" vs ")
-        elif " vs. " in model_comparison:
-            parts = model_comparison.split(" vs. ")
-        else:
-            return None, None
-        
-        if len(parts) == 2:
-            return parts[0].strip(), parts[1].strip()
-        
-        return None, None
-    except Exception:
-        return None, None
+def show_rate_limit_wait():
+    """Tell the user when this run, or background work it used, queued for the webhook rate limit"""
+    waited = get_apps_script_client().limiter.take_wait() + st.session_state.pop('rate_limit_waited', 0.0)
+    if waited >= 0.5:
+        st.caption(f"⏳ Waited {waited:.1f}s for the webhook rate limit")
 
 def validate_email_format(email: str) -> bool:
     """Validate email format"""
@@ -567,22 +432,34 @@ def sanitize_html_output(text: str) -> str:
     """Sanitize text for safe HTML output"""
     return html.escape(str(text))
 
-def validate_email_with_attempts(email: str) -> Tuple[bool, str, dict]:
-    """Validate email against Alias Emails spreadsheet with attempt tracking"""
+def validate_email_with_attempts(email: str, use_cache: bool = True) -> Tuple[bool, str, dict]:
+    """Validate email against Alias Emails spreadsheet with attempt tracking.
+    
+    Cached verdicts are answered without calling the webhook or counting an attempt.
+    """
     if not email or not email.strip():
         return False, "Email is required", {}
     
     if not validate_email_format(email):
         return False, "Invalid email format", {}
     
+    normalized_email = email.lower().strip()
+    validation_cache = get_email_validation_cache()
+    if use_cache:
+        if get_roster_snapshot().contains(normalized_email):
+            return True, "✅ Email found in authorized alias list", {"validation_type": "alias_list"}
+        cached = validation_cache.get(normalized_email)
+        if cached is not None:
+            return cached
+    
     # Initialize or get current attempt count for this email
-    email_key = f"email_attempts_{email.lower().strip()}"
+    email_key = f"email_attempts_{normalized_email}"
     current_attempts = st.session_state.get(email_key, 0) + 1
     st.session_state[email_key] = current_attempts
     
     try:
         # Call the Google Apps Script validation
-        validation_result = apps_script.validate_email(email.strip(), current_attempts)
+        validation_result = get_apps_script_client().validate_email(email.strip(), current_attempts)
         
         if validation_result.get("success"):
             # Email is valid
@@ -596,13 +473,20 @@ def validate_email_with_attempts(email: str) -> Tuple[bool, str, dict]:
             else:
                 message = "✅ Email validated successfully"
                 
-            return True, message, validation_data
+            verdict = (True, message, validation_data)
+            validation_cache.set(normalized_email, verdict)
+            return verdict
         else:
             # Email is not valid
             error_message = validation_result.get("message", "Email validation failed")
             validation_data = validation_result.get("data", {})
+            verdict = (False, f"❌ {error_message}", validation_data)
             
-            return False, f"❌ {error_message}", validation_data
+            # Negative cache only final verdicts: not outages, and not company emails
+            # whose next attempt may succeed through the fallback
+            if not validation_result.get("transient") and not validation_data.get("is_company_email"):
+                validation_cache.set(normalized_email, verdict, EMAIL_NEGATIVE_TTL_SECONDS)
+            return verdict
             
     except Exception as e:
         return False, f"⚠️ Email validation error: {str(e)}", {}
@@ -618,10 +502,16 @@ def get_email_attempt_count(email: str) -> int:
     email_key = f"email_attempts_{email.lower().strip()}"
     return st.session_state.get(email_key, 0)
 
-def validate_question_id_against_sot(question_id: str) -> Tuple[bool, str, dict]:
-    """Validate Question ID against SOT spreadsheet"""
+def check_question_id_in_sot(question_id: str, sot_index: Optional[SotIndex],
+                             client: AppsScriptClient) -> Tuple[bool, str, dict]:
+    """SOT check without Streamlit state (safe on prefetch threads): local index, then webhook"""
     try:
-        validation_result = apps_script.validate_question_id(question_id)
+        task_id = extract_task_id_from_question_id(question_id)
+        sot_row = sot_index.lookup(task_id) if sot_index is not None else None
+        if sot_row is not None:
+            return True, "Question ID validated successfully", {"is_valid": True, "task_id": task_id, **sot_row}
+        
+        validation_result = client.validate_question_id(question_id)
         
         if validation_result.get("success"):
             data = validation_result.get("data", {})
@@ -635,12 +525,108 @@ def validate_question_id_against_sot(question_id: str) -> Tuple[bool, str, dict]
         print(f"Validation error: {str(e)}")
         return True, "Question ID accepted", {}
 
-def generate_drive_url(pdf_buffer: io.BytesIO, filename: str, metadata: dict) -> str:
+def prefetch_question_id_validation():
+    """on_change: start the SOT check as soon as a plausible Question ID is entered"""
+    question_id = st.session_state.get('question_id_input', '').strip()
+    if not extract_task_id_from_question_id(question_id):
+        return
+    client = get_apps_script_client()
+    future = get_prefetch_executor().submit(
+        client.limiter.measure, check_question_id_in_sot, question_id, get_sot_index(), client
+    )
+    st.session_state.sot_prefetch = (question_id, future)
+
+def validate_question_id_against_sot(question_id: str) -> Tuple[bool, str, dict]:
+    """Validate Question ID against SOT spreadsheet, reusing a prefetched result"""
+    prefetched = st.session_state.pop('sot_prefetch', None)
+    if prefetched and prefetched[0] == question_id.strip():
+        try:
+            validation, waited = prefetched[1].result(timeout=PREFETCH_WAIT_SECONDS)
+            note_rate_limit_wait(waited)
+            return validation
+        except Exception as e:
+            print(f"Prefetched validation error: {str(e)}")
+    return check_question_id_in_sot(question_id, get_sot_index(), get_apps_script_client())
+
+def start_speculative_upload(pdf_buffer: io.BytesIO, filename: str, metadata: dict):
+    """Start uploading a generated PDF in the background, tagged with its content hash and email"""
+    cancel_speculative_upload()
+    pdf_data = pdf_buffer.getvalue()
+    cancel_event = threading.Event()
+    client = get_apps_script_client()
+    future = get_upload_executor().submit(
+        client.limiter.measure, client.upload_pdf, io.BytesIO(pdf_data), filename, metadata, None, cancel_event
+    )
+    content_sha256 = hashlib.sha256(pdf_data).hexdigest()
+    user_email = metadata.get('user_email', '')
+    st.session_state.speculative_upload = (content_sha256, user_email, cancel_event, future)
+    # Each PDF and email is tried in the background once; a failure is retried by Load itself
+    attempted = st.session_state.setdefault('speculative_upload_attempted', set())
+    attempted.add((content_sha256, user_email))
+
+def start_speculative_upload_if_ready():
+    """Upload the generated PDF in the background once the submitter's email is validated"""
+    if (not st.session_state.get('speculative_upload_allowed', True)
+            or not st.session_state.get('email_validated')
+            or not st.session_state.get('pdf_generated')
+            or st.session_state.get('drive_url_generated')):
+        return
+    user_email = st.session_state.get('user_email', '')
+    attempted = st.session_state.get('speculative_upload_attempted', set())
+    pdf_sha256 = (st.session_state.get('pdf_sha256')
+                  or hashlib.sha256(st.session_state.pdf_buffer.getvalue()).hexdigest())
+    if (pdf_sha256, user_email) in attempted:
+        return  # Already uploading, or already tried, for this PDF and email
+    start_speculative_upload(
+        st.session_state.pdf_buffer,
+        generate_filename(st.session_state.model1, st.session_state.model2),
+        {
+            'user_email': user_email,
+            'question_id': st.session_state.question_id,
+            'model1': st.session_state.model1,
+            'model2': st.session_state.model2,
+            'timestamp': datetime.now().isoformat()
+        }
+    )
+
+def cancel_speculative_upload():
+    """Stop (or discard the result of) the background upload of an outdated PDF"""
+    speculative = st.session_state.pop('speculative_upload', None)
+    if speculative:
+        _, _, cancel_event, future = speculative
+        cancel_event.set()
+        future.cancel()
+
+def take_speculative_upload(pdf_buffer: io.BytesIO, user_email: str) -> Optional[dict]:
+    """Wait for the background upload of exactly these bytes and email; None if there is none"""
+    speculative = st.session_state.pop('speculative_upload', None)
+    if not speculative:
+        return None
+    content_sha256, uploaded_email, cancel_event, future = speculative
+    if (content_sha256, uploaded_email) != (hashlib.sha256(pdf_buffer.getvalue()).hexdigest(), user_email):
+        cancel_event.set()
+        future.cancel()  # A queued upload never starts
+        return None
+    try:
+        result, waited = future.result()
+    except Exception as e:
+        print(f"Background upload error: {str(e)}")
+        return None
+    note_rate_limit_wait(waited)
+    return result if result.get("success") else None
+
+def generate_drive_url(pdf_buffer: io.BytesIO, filename: str, metadata: dict,
+                       progress_callback: Optional[Callable[[int, int], None]] = None) -> str:
     """Upload PDF to Google Drive and return shareable URL"""
     try:
-        upload_result = apps_script.upload_pdf(pdf_buffer, filename, metadata)
+        # A failed background upload falls through; a chunked one resumes where it stopped
+        upload_result = take_speculative_upload(pdf_buffer, metadata.get('user_email', ''))
+        if upload_result is None:
+            upload_result = get_apps_script_client().upload_pdf(pdf_buffer, filename, metadata, progress_callback)
         
         if upload_result.get("success"):
+            if upload_result.get("data", {}).get("deduplicated"):
+                st.info("♻️ This exact PDF was already uploaded, reusing its Drive URL")
             return upload_result.get("data", {}).get("drive_url", "")
         else:
             st.error(f"Drive upload failed: {upload_result.get('message')}")
@@ -651,551 +637,115 @@ def generate_drive_url(pdf_buffer: io.BytesIO, filename: str, metadata: dict) ->
         return ""
 
 def submit_to_spreadsheet(form_data: dict) -> bool:
-    """Submit form data to Google Sheets tracking tab"""
+    """Queue form data for the Google Sheets tracking tab (sent in the background)"""
     try:
-        log_result = apps_script.log_submission(form_data)
-        return log_result.get("success", False)
-        
+        outbox = get_submission_outbox()
+        if outbox is not None:
+            outbox.enqueue(form_data)
+            return True
+
     except Exception as e:
-        st.error(f"Submission logging error: {str(e)}")
-        return False
+        # Outbox unavailable (e.g. read-only disk): log directly instead
+        print(f"Submission outbox error: {str(e)}")
 
-def generate_filename(model1: str, model2: str) -> str:
-    """Generate a standardized filename for the PDF"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    model1_clean = re.sub(r'[^\w\-_.]', '_', model1)
-    model2_clean = re.sub(r'[^\w\-_.]', '_', model2)
-    return f"SxS_Comparison_{model1_clean}_vs_{model2_clean}_{timestamp}.pdf"
+    # No webhook configured, or no outbox: log directly (and report why it failed)
+    log_result = get_apps_script_client().log_submission(form_data)
+    if not log_result.get("success"):
+        st.error(f"Submission logging error: {log_result.get('message')}")
+    return log_result.get("success", False)
 
 # ============================================================================
-# PDF GENERATION CLASS
+# SLIDE PREVIEWS
 # ============================================================================
 
-class PDFGenerator:
-    """Production-grade PDF generator with Google Slides format and company branding"""
-    
-    def __init__(self):
-        # Google Slides 16:9 format dimensions (720 × 405 points)
-        self.page_width = 10 * inch  # 720 points
-        self.page_height = 5.625 * inch  # 405 points
-        self.slide_format = (self.page_width, self.page_height)
-        
-        # Safe margins
-        self.safe_margin = 0.25 * inch  # Reduced from 0.5" to 0.25"
-        self.content_width = self.page_width - (2 * self.safe_margin)
-        self.content_height = self.page_height - (2 * self.safe_margin)
-        
-        # Company logo dimensions and position (icon)
-        self.logo_size = 0.5 * inch    # Bigger square logo (36 points)
-        self.logo_margin = 0.2 * inch  # Margin from edge
-        
-        # Color scheme (Google Slides Material Design)
-        self.primary_color = HexColor('#4a86e8')  # Cornflower Blue
-        self.text_color = HexColor('#1f2937')     # Dark Gray
-        self.light_gray = HexColor('#f3f4f6')     # Light Gray
-        
-        self.temp_files = []
-        self.company_logo_path = None
-        
-        # Download and cache company logo
-        self._setup_company_logo()
-    
-    def _setup_company_logo(self):
-        """Setup the Invisible company icon (circular logo only)"""
-        try:
-            # Create the Invisible icon without text
-            logo_temp = tempfile.NamedTemporaryFile(delete=False, suffix='.png')
-            
-            # Create a clean circular icon version
-            icon_size = 72
-            logo_img = Image.new('RGBA', (icon_size, icon_size), (255, 255, 255, 0))  # Transparent background
-            draw = ImageDraw.Draw(logo_img)
-            
-            # Draw the circular logo (based on the SVG design)
-            circle_margin = 4
-            circle_size = icon_size - (2 * circle_margin)
-            
-            # Draw outer circle (dark)
-            draw.ellipse([circle_margin, circle_margin, 
-                         circle_margin + circle_size, circle_margin + circle_size], 
-                        fill=(15, 15, 15, 255), outline=None)
-            
-            # Draw inner square (white) - represents the square cutout in the SVG
-            inner_margin = 12
-            inner_size = circle_size - (2 * inner_margin)
-            inner_x = circle_margin + inner_margin
-            inner_y = circle_margin + inner_margin
-            
-            draw.rectangle([inner_x, inner_y, inner_x + inner_size, inner_y + inner_size], 
-                         fill=(255, 255, 255, 255))
-            
-            # Save logo
-            logo_img.save(logo_temp.name, format='PNG')
-            logo_temp.close()
-            
-            self.company_logo_path = logo_temp.name
-            self.temp_files.append(logo_temp.name)
-            
-        except Exception as e:
-            print(f"Warning: Could not create company logo: {e}")
-            self.company_logo_path = None
-    
-    def __enter__(self):
-        return self
-    
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        self.cleanup()
-    
-    def cleanup(self):
-        """Clean up temporary files"""
-        for temp_file in self.temp_files:
-            try:
-                if os.path.exists(temp_file):
-                    os.unlink(temp_file)
-            except Exception as e:
-                st.warning(f"Could not clean up temp file: {e}")
-        self.temp_files = []
-    
-    def prepare_image(self, image_file: BinaryIO) -> Optional[str]:
-        """Convert uploaded image to ReportLab compatible format"""
-        try:
-            # Reset file pointer
-            image_file.seek(0)
-            
-            # Open image with PIL
-            img = Image.open(image_file)
-            
-            # Convert to RGB if necessary
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            # Create temporary file
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.jpg')
-            img.save(temp_file.name, format='JPEG', quality=95, optimize=True)
-            temp_file.close()
-            
-            self.temp_files.append(temp_file.name)
-            return temp_file.name
-            
-        except Exception as e:
-            st.error(f"Error preparing image: {str(e)}")
-            return None
-    
-    def draw_company_logo(self, canvas_obj):
-        """Draw the Invisible company icon in the bottom right corner"""
-        if not self.company_logo_path:
-            return
-            
-        try:
-            # Position icon in bottom right corner
-            logo_x = self.page_width - self.logo_size - self.logo_margin
-            logo_y = self.logo_margin
-            
-            # Draw logo as square icon
-            canvas_obj.drawImage(
-                self.company_logo_path,
-                logo_x,
-                logo_y,
-                width=self.logo_size,
-                height=self.logo_size,
-                preserveAspectRatio=True
-            )
-            
-        except Exception as e:
-            print(f"Warning: Could not draw company logo: {e}")
-    
-    def draw_slide_background(self, canvas_obj):
-        """Draw slide background with Google Slides styling"""
-        # Set background to white
-        canvas_obj.setFillColor(HexColor('#ffffff'))
-        canvas_obj.rect(0, 0, self.page_width, self.page_height, fill=1, stroke=0)
-        
-        # Optional: Add subtle border
-        canvas_obj.setStrokeColor(HexColor('#e5e7eb'))
-        canvas_obj.setLineWidth(1)
-        canvas_obj.rect(0, 0, self.page_width, self.page_height, fill=0, stroke=1)
-
-    def draw_text_with_wrapping(self, canvas_obj, text: str, x: float, y: float, 
-                           max_width: float, font_name: str = "Helvetica", 
-                           font_size: int = 18):
-        return self.draw_wrapped_text(canvas_obj, text, x, y, max_width, 
-                                 font_name, font_size, line_height_factor=1.2)
-        
-        # Split text into words
-        words = text.split(' ')
-        lines = []
-        current_line = ""
-        
-        for word in words:
-            test_line = current_line + word + " "
-            if canvas_obj.stringWidth(test_line, font_name, font_size) < max_width:
-                current_line = test_line
-            else:
-                if current_line:
-                    lines.append(current_line.strip())
-                    current_line = word + " "
-                else:
-                    lines.append(word)
-                    current_line = ""
-        
-        if current_line:
-            lines.append(current_line.strip())
-        
-        # Draw lines with proper spacing for slides
-        current_y = y
-        line_height = font_size * 1.2
-        
-        for line in lines:
-            canvas_obj.drawString(x, current_y, line)
-            current_y -= line_height
-        
-        return current_y
-    
-    def draw_centered_text(self, canvas_obj, text: str, y: float, 
-                          font_name: str = "Helvetica-Bold", font_size: int = 48,
-                          color: HexColor = None):
-        """Draw centered text with slide-appropriate styling"""
-        if color is None:
-            color = self.text_color
-            
-        canvas_obj.setFont(font_name, font_size)
-        canvas_obj.setFillColor(color)
-        
-        text_width = canvas_obj.stringWidth(text, font_name, font_size)
-        x = (self.page_width - text_width) / 2
-        canvas_obj.drawString(x, y, text)
-    
-    def draw_slide_title(self, canvas_obj, text: str, y: float = None):
-        """Draw slide title with consistent positioning"""
-        if y is None:
-            y = self.page_height - self.safe_margin - 60
-        
-        self.draw_centered_text(
-            canvas_obj, 
-            text, 
-            y, 
-            font_name="Helvetica-Bold", 
-            font_size=40,
-            color=self.primary_color
-        )
-    
-    def draw_image_centered(self, canvas_obj, image_path: str, max_width: float = None, 
-                           max_height: float = None):
-        """Draw image centered on slide with proper scaling for 16:9 format"""
-        try:
-            # Get image dimensions
-            img = Image.open(image_path)
-            img_width, img_height = img.size
-            
-            # Set default max dimensions for slide format
-            if max_width is None:
-                max_width = self.content_width
-            if max_height is None:
-                max_height = self.content_height
-            
-            # Calculate scaling to fit within slide bounds
-            if img_width > max_width or img_height > max_height:
-                ratio = min(max_width / img_width, max_height / img_height)
-                new_width = int(img_width * ratio)
-                new_height = int(img_height * ratio)
-            else:
-                new_width = img_width
-                new_height = img_height
-            
-            # Center the image on the slide
-            x = (self.page_width - new_width) / 2
-            y = (self.page_height - new_height) / 2
-            
-            # Draw image
-            canvas_obj.drawImage(image_path, x, y, width=new_width, height=new_height)
-            
-        except Exception as e:
-            st.error(f"Error drawing image: {str(e)}")
-    
-    def create_title_slide(self, canvas_obj, question_id: str, prompt: str, 
-                      prompt_image: Optional[BinaryIO] = None):
-        
-        # Draw background
-        self.draw_slide_background(canvas_obj)
-        
-        # Start from top with better spacing
-        y_pos = self.page_height - self.safe_margin - 15
-        
-        # === QUESTION ID SECTION ===
-        canvas_obj.setFont("Helvetica-Bold", 14)
-        canvas_obj.setFillColor(self.primary_color)
-        canvas_obj.drawString(self.safe_margin, y_pos, "ID:")
-        y_pos -= 18
-        
-        # Write question ID with multi-line wrapping
-        y_pos = self.draw_wrapped_text(canvas_obj, question_id, 
-                                    self.safe_margin, y_pos, 
-                                    self.content_width, 
-                                    font_name="Helvetica", font_size=9,
-                                    line_height_factor=1.1)
-        y_pos -= 25  # spacing after ID
-        
-        # === DETERMINE LAYOUT STRUCTURE ===
-        # Calculate column dimensions based on whether image is present
-        if prompt_image is not None:
-            # Two-column layout: 60% text, 38% image, 2% gap
-            text_column_width = self.content_width * 0.60
-            gap_width = self.content_width * 0.02
-            image_column_width = self.content_width * 0.38
-            image_column_x = self.safe_margin + text_column_width + gap_width
-        else:
-            # Single column for text when no image
-            text_column_width = self.content_width
-            image_column_width = 0
-            image_column_x = 0
-        
-        # Store starting Y position for columns
-        content_start_y = y_pos
-        
-        # === LEFT COLUMN: PROMPT TEXT ===
-        canvas_obj.setFont("Helvetica-Bold", 14)
-        canvas_obj.setFillColor(self.primary_color)
-        canvas_obj.drawString(self.safe_margin, y_pos, "Initial Prompt:")
-        y_pos -= 20
-        
-        # Write wrapped prompt text in left column
-        prompt_end_y = self.draw_wrapped_text(canvas_obj, prompt,
-                                            self.safe_margin, y_pos,
-                                            text_column_width,
-                                            font_name="Helvetica", font_size=12,
-                                            line_height_factor=1.3)
-        
-        # === RIGHT COLUMN: PROMPT IMAGE ===
-        if prompt_image is not None:
-            available_height = content_start_y - self.safe_margin - 60  # space for Inv logo
-            self.draw_prompt_image_in_column(canvas_obj, prompt_image,
-                                        image_column_x, content_start_y - 20,  # Start below "Initial Prompt:"
-                                        image_column_width,
-                                        available_height)
-        
-        # Use company logo
-        self.draw_company_logo(canvas_obj)
-
-    def draw_wrapped_text(self, canvas_obj, text: str, x: float, y: float, 
-                        max_width: float, font_name: str = "Helvetica", 
-                        font_size: int = 12, line_height_factor: float = 1.2):
-        """Draw text with automatic line wrapping and return the final Y position"""
-        canvas_obj.setFont(font_name, font_size)
-        canvas_obj.setFillColor(self.text_color)
-        
-        # Handle very long words by breaking them if necessary
-        def break_long_word(word, max_word_width):
-            """Break a word that's too long to fit on one line"""
-            if canvas_obj.stringWidth(word, font_name, font_size) <= max_word_width:
-                return [word]
-            
-            broken_parts = []
-            current_part = ""
-            
-            for char in word:
-                test_part = current_part + char
-                if canvas_obj.stringWidth(test_part, font_name, font_size) <= max_word_width:
-                    current_part = test_part
-                else:
-                    if current_part:
-                        broken_parts.append(current_part)
-                    current_part = char
-            
-            if current_part:
-                broken_parts.append(current_part)
-            
-            return broken_parts
-        
-        # Split text into words and handle wrapping
-        words = text.split()
-        lines = []
-        current_line = ""
-        
-        for word in words:
-            # Check if word itself is too long
-            if canvas_obj.stringWidth(word, font_name, font_size) > max_width:
-                # Add current line if it has content
-                if current_line.strip():
-                    lines.append(current_line.strip())
-                    current_line = ""
-                
-                # Break the long word
-                broken_words = break_long_word(word, max_width)
-                for i, broken_word in enumerate(broken_words):
-                    if i == len(broken_words) - 1:  # Last part
-                        current_line = broken_word + " "
-                    else:
-                        lines.append(broken_word)
-            else:
-                # Normal word processing
-                test_line = current_line + word + " "
-                if canvas_obj.stringWidth(test_line, font_name, font_size) <= max_width:
-                    current_line = test_line
-                else:
-                    if current_line.strip():
-                        lines.append(current_line.strip())
-                    current_line = word + " "
-        
-        # Add the last line
-        if current_line.strip():
-            lines.append(current_line.strip())
-        
-        # Draw all lines
-        current_y = y
-        line_height = font_size * line_height_factor
-        
-        for line in lines:
-            canvas_obj.drawString(x, current_y, line)
-            current_y -= line_height
-        
-        return current_y
+@st.cache_data(max_entries=512, show_spinner=False)
+def render_slide_preview(fingerprint: str, slide_kind: str, _slide_args: tuple) -> bytes:
+    """Rasterize one slide to PNG bytes, cached per slide fingerprint.
+    
+    The fingerprint only covers slide content, not position, so reordering
+    screenshots reuses every cached thumbnail.
+    """
+    return render_slide_png(slide_kind, _slide_args)
 
-    def draw_prompt_image_in_column(self, canvas_obj, image_file: BinaryIO, 
-                                x: float, y: float, column_width: float, 
-                                available_height: float):
-        """Draw prompt image within the specified column bounds with proper scaling"""
-        try:
-            # Reset file pointer and prepare image
-            image_file.seek(0)
-            image_data = image_file.read()
-            
-            if not image_data:
-                print("No image data found")
-                return
-                
-            # Create temporary file for the image
-            temp_image = tempfile.NamedTemporaryFile(delete=False, suffix='.jpg')
-            temp_image.write(image_data)
-            temp_image.close()
-            
-            # Add to cleanup list
-            self.temp_files.append(temp_image.name)
-            
-            # Verify file and get image dimensions
-            if not os.path.exists(temp_image.name) or os.path.getsize(temp_image.name) == 0:
-                print(f"Invalid temp image file: {temp_image.name}")
-                return
-                
-            # Open and process the image
-            img = Image.open(temp_image.name)
-            img_width, img_height = img.size
-            
-            # Calculate scaling to fit within column bounds
-            width_ratio = column_width / img_width
-            height_ratio = available_height / img_height
-            scale_ratio = min(width_ratio, height_ratio, 1.0)  # Don't upscale beyond original size
-            
-            new_width = img_width * scale_ratio
-            new_height = img_height * scale_ratio
-            
-            # Center image horizontally within column, align to top vertically
-            image_x = x + (column_width - new_width) / 2
-            image_y = y - new_height  # Align to top of available space
-            
-            # Ensure image doesn't go below bottom margin
-            min_y = self.safe_margin + 60  # Leave space for Inv logo
-            if image_y < min_y:
-                # Recalculate to fit within available space
-                adjusted_height = y - min_y
-                height_ratio = adjusted_height / img_height
-                scale_ratio = min(width_ratio, height_ratio, 1.0)
-                
-                new_width = img_width * scale_ratio
-                new_height = img_height * scale_ratio
-                image_x = x + (column_width - new_width) / 2
-                image_y = y - new_height
-            
-            # Draw the image
-            canvas_obj.drawImage(temp_image.name, image_x, image_y, 
-                            width=new_width, height=new_height,
-                            preserveAspectRatio=True)
-            
-            print(f"Successfully drew prompt image at ({image_x}, {image_y}) with size {new_width}x{new_height}")
-            
-        except Exception as e:
-            print(f"Error drawing prompt image: {str(e)}")
-            print(f"Error details: {traceback.format_exc()}")
-    
-    def create_model_title_slide(self, canvas_obj, model_name: str):
-        """Create a model title slide with Google Slides styling"""
-        
-        # Draw background
-        self.draw_slide_background(canvas_obj)
-        
-        # Draw model name in center
-        self.draw_centered_text(
-            canvas_obj, 
-            model_name, 
-            self.page_height / 2, 
-            font_name="Helvetica-Bold", 
-            font_size=56,
-            color=self.primary_color
-        )
-        
-        # Draw company logo
-        self.draw_company_logo(canvas_obj)
+@st.cache_data(max_entries=1024, show_spinner=False)
+def upload_thumbnail(fingerprint: str, _image_file: BinaryIO) -> bytes:
+    """Small JPEG of an uploaded screenshot, made once per content hash"""
+    return make_image_thumbnail(_image_file)
+
+def display_deck_preview(model1_images: List[BinaryIO], model2_images: List[BinaryIO]):
+    """Show a live thumbnail preview of the deck before any PDF is generated"""
+    plan = build_slide_preview_plan(
+        st.session_state.question_id,
+        st.session_state.prompt_text,
+        st.session_state.model1,
+        st.session_state.model2,
+        model1_images,
+        model2_images,
+        st.session_state.get('prompt_image')
+    )
     
-    def create_image_slide(self, canvas_obj, image_path: str):
-        """Create an image slide with Google Slides styling and maximized image space"""
-        
-        # Draw background
-        self.draw_slide_background(canvas_obj)
-        
-        # Draw image centered, maximizing space
-        max_height = self.content_height - 20  # Minimal space for logo
-        max_width = self.content_width - 20    # Small buffer for them aesthetics
-        
-        self.draw_image_centered(canvas_obj, image_path, 
-                               max_width=max_width, 
-                               max_height=max_height)
-        
-        # Draw company logo
-        self.draw_company_logo(canvas_obj)
+    st.caption(f"{len(plan)} slides • Thumbnails follow your current order")
     
-    def generate_pdf(self, question_id: str, prompt: str, model1: str, model2: str,
-                    model1_images: List[BinaryIO], model2_images: List[BinaryIO],
-                    prompt_image: Optional[BinaryIO] = None) -> io.BytesIO:
-        """Generate the complete PDF with Google Slides 16:9 format"""
-        
-        buffer = io.BytesIO()
-        c = canvas.Canvas(buffer, pagesize=self.slide_format)
-        
-        try:
-            # Slide 1: Title slide with ID, prompt, and optional image
-            self.create_title_slide(c, question_id, prompt, prompt_image)
-            
-            # Slide 2: First model title slide
-            c.showPage()
-            self.create_model_title_slide(c, model1)
-            
-            # First model image slides (one image per slide)
-            for i, img_file in enumerate(model1_images):
-                c.showPage()
-                temp_image_path = self.prepare_image(img_file)
-                if temp_image_path:
-                    self.create_image_slide(c, temp_image_path)
-            
-            # Second model title slide
-            c.showPage()
-            self.create_model_title_slide(c, model2)
-            
-            # Second model image slides (one image per slide)
-            for i, img_file in enumerate(model2_images):
-                c.showPage()
-                temp_image_path = self.prepare_image(img_file)
-                if temp_image_path:
-                    self.create_image_slide(c, temp_image_path)
-            
-            # Finalize PDF
-            c.save()
-            buffer.seek(0)
-            
-            return buffer
-            
-        except Exception as e:
-            st.error(f"Error generating PDF: {str(e)}")
-            st.error(f"Traceback: {traceback.format_exc()}")
-            raise e
+    for row_start in range(0, len(plan), PREVIEW_COLUMNS):
+        cols = st.columns(PREVIEW_COLUMNS)
+        row = plan[row_start:row_start + PREVIEW_COLUMNS]
+        for offset, (col, (caption, fingerprint, kind, args)) in enumerate(zip(cols, row)):
+            with col:
+                st.image(
+                    render_slide_preview(fingerprint, kind, args),
+                    caption=f"{row_start + offset + 1}. {caption}",
+                    use_container_width=True
+                )
+
+# ============================================================================
+# INPUT BUNDLES
+# ============================================================================
+
+def build_session_bundle() -> SxsBundle:
+    """Snapshot the current session inputs as a reproducible bundle"""
+    prompt_image = st.session_state.get('prompt_image')
+    return SxsBundle(
+        question_id=st.session_state.question_id,
+        prompt=st.session_state.prompt_text,
+        model1=st.session_state.model1,
+        model2=st.session_state.model2,
+        model1_images=[BundleImage.from_file(image) for image in st.session_state.model1_images],
+        model2_images=[BundleImage.from_file(image) for image in st.session_state.model2_images],
+        prompt_image=BundleImage.from_file(prompt_image) if prompt_image else None,
+        task_id=st.session_state.get('task_id', ''),
+        sot={
+            "language": st.session_state.get('sot_language', ''),
+            "project_type": st.session_state.get('sot_project_type', ''),
+            "model_comparison": st.session_state.get('sot_model_comparison', '')
+        }
+    )
+
+def apply_bundle_to_session(bundle: SxsBundle):
+    """Load bundle inputs into session state, completing steps 1 and 2"""
+    st.session_state.question_id = bundle.question_id
+    st.session_state.question_id_input = bundle.question_id
+    st.session_state.task_id = bundle.task_id or extract_task_id_from_question_id(bundle.question_id)
+    st.session_state.prompt_text = bundle.prompt
+    st.session_state.model1 = bundle.model1
+    st.session_state.model2 = bundle.model2
+    st.session_state.sot_language = bundle.sot.get("language", "")
+    st.session_state.sot_project_type = bundle.sot.get("project_type", "")
+    st.session_state.sot_model_comparison = bundle.sot.get("model_comparison", "")
+    st.session_state.question_id_validated = True
+    st.session_state.model1_images = [image.open() for image in bundle.model1_images]
+    st.session_state.model2_images = [image.open() for image in bundle.model2_images]
+    if bundle.prompt_image:
+        st.session_state.prompt_image = bundle.prompt_image.open()
+    else:
+        st.session_state.pop('prompt_image', None)
+    
+    # Inputs changed, so any earlier PDF and reorder state no longer apply
+    cancel_speculative_upload()
+    for key in ['pdf_buffer', 'bundle_bytes', 'model1_reordered', 'model2_reordered']:
+        st.session_state.pop(key, None)
+    st.session_state.pdf_generated = False
+    st.session_state.drive_url_generated = False
+    st.session_state.drive_url = ""
 
 # ============================================================================
 # EMAIL VALIDATION UI COMPONENTS
@@ -1229,6 +779,7 @@ def display_email_validation_ui():
                     st.success(message)
                     st.session_state.email_validated = True
                     st.session_state.user_email = user_email
+                    start_speculative_upload_if_ready()
                     st.session_state.validation_data = validation_data
                 else:
                     st.error(message)
@@ -1259,6 +810,51 @@ def display_email_validation_ui():
     
     return st.session_state.get('email_validated', False)
 
+@st.fragment
+def email_input_row():
+    """Step 4 email field and status; typing reruns only this row"""
+    validated_before = st.session_state.get('email_validated', False)
+    
+    col1, col2, col3 = st.columns([2, 6, 2])
+    with col1:
+        st.markdown('<p class="form-label">Email Address:</p>', unsafe_allow_html=True)
+    with col2:
+        user_email = st.text_input(
+            "Email Address",
+            placeholder="Please input your email address",
+            key="email_input_form",
+            label_visibility="collapsed"
+        )
+    with col3:
+        if user_email:
+            if validate_email_format(user_email):
+                # Validate once per entered value; other reruns reuse the verdict
+                checked_email, is_email_valid = st.session_state.get('email_check', (None, False))
+                if checked_email != user_email:
+                    is_email_valid, _, _ = validate_email_with_attempts(user_email)
+                    st.session_state.email_check = (user_email, is_email_valid)
+                    show_rate_limit_wait()
+                if is_email_valid:
+                    st.markdown('<div class="validation-status validation-success">✓ Valid</div>', unsafe_allow_html=True)
+                    st.session_state.email_validated = True
+                    st.session_state.user_email = user_email
+                    start_speculative_upload_if_ready()
+                else:
+                    st.markdown('<div class="validation-status validation-error">✗ Invalid</div>', unsafe_allow_html=True)
+                    st.session_state.email_validated = False
+                    st.button("🔁 Retry", key="retry_email_validation", help="Check this email again",
+                              on_click=st.session_state.pop, args=('email_check', None))
+            else:
+                st.markdown('<div class="validation-status validation-error">✗ Format</div>', unsafe_allow_html=True)
+                st.session_state.email_validated = False
+        else:
+            st.markdown('<div class="validation-status">⚪ Pending</div>', unsafe_allow_html=True)
+            st.session_state.email_validated = False
+    
+    # Load and Submit depend on the verdict: refresh the whole page when it flips
+    if st.session_state.email_validated != validated_before and not st.session_state.get('email_row_full_run'):
+        st.rerun()
+
 def display_connection_status():
     """Connection status including email validation tab check"""
     
@@ -1267,7 +863,20 @@ def display_connection_status():
     if st.sidebar.button("🔄 Test Connection", key="test_connection"):
         with st.sidebar:
             with st.spinner("Testing connection..."):
-                connection_result = apps_script.test_connection()
+                client = get_apps_script_client()
+                if client.batch_supported and client.webhook_url:
+                    # One trip: the connection test also refreshes the roster and SOT snapshots
+                    roster, sot_index = get_roster_snapshot(), get_sot_index()
+                    connection_result, roster_result, sot_result = client.batch([
+                        {"action": "test_connection"},
+                        roster.refresh_operation(),
+                        sot_index.refresh_operation()
+                    ])
+                    roster.apply_result(roster_result)
+                    sot_index.apply_result(sot_result)
+                else:
+                    # Without batch the snapshots keep refreshing on their own schedule
+                    connection_result = client.test_connection()
         
         if connection_result.get("success"):
             st.sidebar.success("🟢 System Ready")
@@ -1288,8 +897,55 @@ def display_connection_status():
             st.sidebar.warning(f"❌ {connection_result.get('message', 'Connection failed')}")
     
     # Show webhook configuration status
-    if WEBHOOK_URL:
+    if get_webhook_url():
         st.sidebar.text("🔗 Webhook: Configured")
+        
+        breaker = get_apps_script_client().breaker.snapshot()
+        if breaker["state"] == "open":
+            st.sidebar.error(f"⚡ Webhook circuit: Open (retrying in {breaker['retry_in']:.0f}s)")
+            if breaker["last_error"]:
+                st.sidebar.caption(f"Last error: {breaker['last_error'][:120]}")
+        elif breaker["state"] == "half_open":
+            st.sidebar.warning("⚡ Webhook circuit: Half-open (next call checks recovery)")
+        else:
+            st.sidebar.text("⚡ Webhook circuit: Closed")
+            if breaker["consecutive_failures"]:
+                st.sidebar.caption(f"{breaker['consecutive_failures']} recent failed call(s)")
+        
+        limiter_stats = get_apps_script_client().limiter.stats().values()
+        waited_calls = sum(stats["waited_calls"] for stats in limiter_stats)
+        rejected_calls = sum(stats["rejected"] for stats in limiter_stats)
+        if waited_calls or rejected_calls:
+            wait_seconds = sum(stats["wait_seconds"] for stats in limiter_stats)
+            max_wait = max(stats["max_wait"] for stats in limiter_stats)
+            st.sidebar.caption(
+                f"⏳ Rate limit: {waited_calls} call(s) queued ({wait_seconds:.1f}s total, "
+                f"longest {max_wait:.1f}s), {rejected_calls} rejected"
+            )
+        
+        roster = get_roster_snapshot()
+        roster_stats = roster.stats()
+        sot_stats = get_sot_index().stats()
+        if sot_stats["fresh"]:
+            st.sidebar.text(f"🗂️ SOT index: {len(get_sot_index())} tasks (updated {sot_stats['age'] / 60:.0f} min ago)")
+        elif sot_stats["supported"]:
+            st.sidebar.caption("🗂️ SOT index not current; Question IDs are checked online")
+        
+        if roster_stats["fresh"]:
+            st.sidebar.text(f"👥 Roster: {len(roster)} emails (updated {roster_stats['age']:.0f}s ago)")
+        elif roster_stats["supported"]:
+            st.sidebar.caption("👥 Roster snapshot not current; emails are checked online")
+        
+        try:
+            outbox = get_submission_outbox().stats()
+            if outbox["failing"]:
+                st.sidebar.warning(f"📮 Submissions: {outbox['pending']} queued, {outbox['failing']} retrying")
+            elif outbox["pending"]:
+                st.sidebar.text(f"📮 Submissions: {outbox['pending']} queued")
+            else:
+                st.sidebar.text("📮 Submissions: All sent")
+        except Exception as e:
+            st.sidebar.caption(f"📮 Outbox unavailable: {str(e)}")
     else:
         st.sidebar.error("🔗 Webhook: Not configured")
         st.sidebar.info("Set WEBHOOK_URL in Streamlit secrets")
@@ -1304,7 +960,7 @@ def show_admin_functions():
         test_email = st.text_input("Test Email:", key="admin_test_email")
         if st.button("Test Validation") and test_email:
             with st.spinner("Testing..."):
-                is_valid, message, data = validate_email_with_attempts(test_email)
+                is_valid, message, data = validate_email_with_attempts(test_email, use_cache=False)
                 if is_valid:
                     st.success(f"✅ {message}")
                 else:
@@ -1317,6 +973,8 @@ def show_admin_functions():
             keys_to_remove = [key for key in st.session_state.keys() if key.startswith('email_attempts_')]
             for key in keys_to_remove:
                 del st.session_state[key]
+            st.session_state.pop('email_check', None)
+            get_email_validation_cache().clear()
             st.success("All email attempts reset")
 
 # ============================================================================
@@ -1404,6 +1062,37 @@ def show_next_step_button(current_page):
             st.session_state.current_page = next_step
             st.rerun()
 
+def is_browser_session_active() -> bool:
+    """Check whether the browser session behind this script run is still connected"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        if ctx is None or not st.runtime.exists():
+            return True
+        return st.runtime.get_instance().is_active_session(ctx.session_id)
+    except Exception:
+        # Runtime internals unavailable - assume the user is still there
+        return True
+
+def make_generation_progress_callback(progress_bar, cancel_token: CancellationToken) -> Callable[[ProgressEvent], None]:
+    """Map generate_pdf progress events onto a Streamlit progress bar"""
+    stage_labels = {"prepared": "Preparing images", "drawn": "Drawing slides", "saved": "PDF saved"}
+    
+    def on_progress(event: ProgressEvent):
+        # Stop burning CPU on generations whose browser tab is gone
+        if not is_browser_session_active():
+            cancel_token.cancel()
+            return
+        
+        start, end = PROGRESS_STAGE_RANGES[event.stage]
+        fraction = start + (end - start) * event.current / max(event.total, 1)
+        progress_bar.progress(
+            min(fraction, 1.0),
+            text=f"{stage_labels[event.stage]} ({event.current}/{event.total})"
+        )
+    
+    return on_progress
+
 def create_pdf_preview(pdf_buffer: io.BytesIO) -> str:
     """Create a base64 encoded PDF preview for display"""
     try:
@@ -1434,13 +1123,52 @@ def display_pdf_preview(pdf_buffer: io.BytesIO):
     except Exception as e:
         st.error(f"Error displaying PDF preview: {str(e)}")
 
+def swap_reordered_images(reorder_key: str, i: int, j: int):
+    """Button callback: swap two positions of a reorder list"""
+    order = list(st.session_state[reorder_key])
+    order[i], order[j] = order[j], order[i]
+    st.session_state[reorder_key] = order
+
+def parse_order_spec(spec: str, count: int) -> List[int]:
+    """Turn "5, 1 3" into a full 0-based ordering: listed positions first, the rest keep their order"""
+    tokens = [token for token in re.split(r'[\s,;]+', spec.strip()) if token]
+    if not tokens:
+        raise ValueError("Enter positions such as 3,1,2")
+    
+    positions = []
+    for token in tokens:
+        if not token.isdigit() or not 1 <= int(token) <= count:
+            raise ValueError(f"'{token}' is not a position between 1 and {count}")
+        if int(token) - 1 in positions:
+            raise ValueError(f"Position {token} is listed twice")
+        positions.append(int(token) - 1)
+    
+    return positions + [index for index in range(count) if index not in positions]
+
+def apply_order_spec(reorder_key: str, spec_key: str):
+    """Text input callback: apply a whole new ordering in one rerun"""
+    order = list(st.session_state[reorder_key])
+    try:
+        new_order = parse_order_spec(st.session_state.get(spec_key, ''), len(order))
+    except ValueError as e:
+        st.session_state[f"{spec_key}_error"] = str(e)
+        return
+    st.session_state[reorder_key] = [order[index] for index in new_order]
+    st.session_state[spec_key] = ""
+    st.session_state.pop(f"{spec_key}_error", None)
+
+@st.fragment
 def create_reorderable_image_preview(images, model_name, session_key):
-    """Image preview with reordering capabilities"""
+    """Image preview with reordering capabilities.
+    
+    Runs as a fragment: reorder clicks rerun only this preview, and the new order
+    is read from session state by the rest of the page on its next run.
+    """
     if not images:
         return images
     
     st.markdown(f"### 🔍 Preview & Reorder {model_name} Images")
-    st.info("💡 **Tip**: Use ⬆️⬇️ buttons to reorder. Final order will be saved when you click '💾 Save Images' below.")
+    st.info("💡 **Tip**: Use ⬆️⬇️ buttons to reorder, or type a new order (e.g. `5,1`) to move several images at once. Final order will be saved when you click '💾 Save Images' below. The live deck preview catches up on your next action outside this list.")
     
     # Store reordered images in session state with unique key
     reorder_key = f"{session_key}_reordered"
@@ -1449,21 +1177,43 @@ def create_reorderable_image_preview(images, model_name, session_key):
     
     current_images = st.session_state[reorder_key]
     
+    # Whole new ordering in one interaction: listed positions move to the top, in that order
+    spec_key = f"{session_key}_order_spec"
+    st.text_input(
+        "🔢 New order",
+        key=spec_key,
+        placeholder=f"e.g. {len(current_images)},1 puts image {len(current_images)} first and image 1 second",
+        help="Positions to put first, in order; images you leave out keep their current order after them",
+        on_change=apply_order_spec,
+        args=(reorder_key, spec_key)
+    )
+    if st.session_state.get(f"{spec_key}_error"):
+        st.error(f"❌ {st.session_state[f'{spec_key}_error']}")
+    
     # Check if order has changed from original
     order_changed = current_images != list(images)
     if order_changed:
         st.success("✅ **Order modified** - Remember to click 'Save Images' to confirm changes")
     
     # Display images with ONLY up/down controls
+    fingerprints_seen = []
     for i, img in enumerate(current_images):
         with st.container():
             # Layout: image on left, minimal controls on right
             col_img, col_controls = st.columns([5, 1])
             
             with col_img:
-                # Display image with position number
+                # Thumbnail by default; the full-size upload is only sent when asked for
+                image_fingerprint = get_content_fingerprint(img)
+                duplicate_index = fingerprints_seen.count(image_fingerprint)
+                fingerprints_seen.append(image_fingerprint)
+                show_full = st.toggle(
+                    "🔍 Full size",
+                    key=f"{session_key}_full_{image_fingerprint}_{duplicate_index}",
+                    help="Show the original upload"
+                )
                 st.image(
-                    img, 
+                    img if show_full else upload_thumbnail(image_fingerprint, img),
                     caption=f"Position {i+1}: {model_name}", 
                     use_container_width=True
                 )
@@ -1471,23 +1221,19 @@ def create_reorderable_image_preview(images, model_name, session_key):
             with col_controls:
                 st.markdown(f"**#{i+1}**")
                 
-                # Move up button
+                # Move up button (callbacks apply the swap before this fragment reruns)
                 if i > 0:
-                    if st.button("⬆️", 
-                                help="Move up", 
-                                key=f"{model_name}_{session_key}_up_{i}"):
-                        current_images[i], current_images[i-1] = current_images[i-1], current_images[i]
-                        st.session_state[reorder_key] = current_images
-                        st.rerun()
+                    st.button("⬆️", 
+                              help="Move up", 
+                              key=f"{model_name}_{session_key}_up_{i}",
+                              on_click=swap_reordered_images, args=(reorder_key, i, i - 1))
                 
                 # Move down button
                 if i < len(current_images) - 1:
-                    if st.button("⬇️", 
-                                help="Move down", 
-                                key=f"{model_name}_{session_key}_down_{i}"):
-                        current_images[i], current_images[i+1] = current_images[i+1], current_images[i]
-                        st.session_state[reorder_key] = current_images
-                        st.rerun()
+                    st.button("⬇️", 
+                              help="Move down", 
+                              key=f"{model_name}_{session_key}_down_{i}",
+                              on_click=swap_reordered_images, args=(reorder_key, i, i + 1))
             
             # Subtle separator
             if i < len(current_images) - 1:
@@ -1497,12 +1243,10 @@ def create_reorderable_image_preview(images, model_name, session_key):
     if order_changed:
         col1, col2, col3 = st.columns([1, 1, 1])
         with col2:
-            if st.button(f"🔄 Reset {model_name} Order", 
-                        key=f"{model_name}_{session_key}_reset",
-                        help="Reset to original upload order"):
-                st.session_state[reorder_key] = list(images)
-                st.success("Order reset!")
-                st.rerun()
+            st.button(f"🔄 Reset {model_name} Order", 
+                      key=f"{model_name}_{session_key}_reset",
+                      help="Reset to original upload order",
+                      on_click=st.session_state.__setitem__, args=(reorder_key, list(images)))
     
     return st.session_state[reorder_key]
 
@@ -1609,6 +1353,17 @@ def image_upload_page():
                         "model2"  # Different session key to avoid conflicts
                     )
     
+    # ===================
+    # LIVE DECK PREVIEW
+    # ===================
+    
+    preview_model1_images = [img for img in (model1_images or []) if validate_file_size(img)]
+    preview_model2_images = [img for img in (model2_images or []) if validate_file_size(img)]
+    
+    if preview_model1_images or preview_model2_images:
+        with st.expander("🖼️ Live Deck Preview", expanded=True):
+            display_deck_preview(preview_model1_images, preview_model2_images)
+    
     # ===================
     # SINGLE SAVE BUTTON
     # ===================
@@ -1768,19 +1523,42 @@ def main():
             You can find the <strong>Question ID</strong> at the top right of the CrC task — look for the 🛈 icon and check the "Question ID(s)" section.</p>
         </div>
         """, unsafe_allow_html=True)
+        
+        with st.expander("📦 Import SxS Bundle", expanded=False):
+            st.caption("Restore every input (metadata, SOT fields, screenshots and their order) from a bundle exported in Step 3.")
+            bundle_file = st.file_uploader(
+                "SxS bundle",
+                type=['zip'],
+                key="bundle_import_file",
+                help=f"A *{BUNDLE_EXTENSION} file"
+            )
+            if bundle_file and st.button("📥 Load Bundle", type="secondary"):
+                try:
+                    bundle = read_bundle(bundle_file)
+                    apply_bundle_to_session(bundle)
+                    st.success(
+                        f"✅ Loaded bundle for {bundle.model1} vs {bundle.model2} "
+                        f"({len(bundle.model1_images)} + {len(bundle.model2_images)} images)"
+                    )
+                except BundleError as e:
+                    st.error(f"❌ Invalid bundle: {str(e)}")
 
         
+        # Outside the form so the SOT lookup can start as soon as the ID is entered
+        if 'question_id_input' not in st.session_state:
+            st.session_state.question_id_input = st.session_state.get('question_id', '')
+        question_id = st.text_input(
+            "Question ID *",
+            placeholder="e.g., bfdf67160ca3eca9b65f040e350b2f1f+bard_data+coach_P128628...",
+            help="Enter the unique identifier for this comparison",
+            key="question_id_input",
+            on_change=prefetch_question_id_validation
+        )
+        
         with st.form("metadata_form"):
             col1, col2 = st.columns(2)
             
             with col1:
-                question_id = st.text_input(
-                    "Question ID *",
-                    placeholder="e.g., bfdf67160ca3eca9b65f040e350b2f1f+bard_data+coach_P128628...",
-                    help="Enter the unique identifier for this comparison",
-                    value=st.session_state.get('question_id', '')
-                )
-                
                 model_combo = st.selectbox(
                     "Select Model Combination *",
                     options=MODEL_COMBINATIONS,
@@ -1817,6 +1595,7 @@ def main():
                 if question_id and prompt_text and model_combo:
                     # Validate Question ID against SOT and get SOT data
                     is_valid, message, sot_data = validate_question_id_against_sot(question_id)
+                    show_rate_limit_wait()
                     
                     if is_valid:
                         # Extract Task ID for display
@@ -1950,6 +1729,12 @@ def main():
         # 🛡️ SINGLE GENERATION LOGIC - PREVENTS MULTIPLE PDF CREATION
         # ============================================================================
         
+        # A token left behind means an earlier run was interrupted mid-generation
+        stale_cancel_token = st.session_state.pop('pdf_cancel_token', None)
+        if stale_cancel_token is not None:
+            stale_cancel_token.cancel()
+            st.info("⏹️ The previous PDF generation was cancelled.")
+        
         # Check if PDF has already been generated this session
         pdf_already_generated = st.session_state.get('pdf_generated', False)
         
@@ -1957,40 +1742,67 @@ def main():
             # Show generation button only if PDF hasn't been generated yet
             col1, col2, col3 = st.columns([1, 1, 1])
             with col2:
+                st.checkbox(
+                    "⚡ Start Drive upload once the email is validated",
+                    value=True,
+                    key="speculative_upload_enabled",
+                    help="Uploads in the background so Load in Step 4 usually finishes instantly"
+                )
                 if st.button("🔄 Generate PDF", type="primary", use_container_width=True):
-                    with st.spinner("Generating PDF..."):
-                        try:
-                            # Use context manager for proper cleanup
-                            with PDFGenerator() as pdf_gen:
-                                pdf_buffer = pdf_gen.generate_pdf(
-                                    st.session_state.question_id,
-                                    st.session_state.prompt_text,
-                                    st.session_state.model1,
-                                    st.session_state.model2,
-                                    st.session_state.model1_images,
-                                    st.session_state.model2_images,
-                                    st.session_state.get('prompt_image')
-                                )
-                                
-                                # Store in session state with generation timestamp
-                                st.session_state.pdf_buffer = pdf_buffer
-                                st.session_state.pdf_generated = True
-                                st.session_state.pdf_generation_time = datetime.now().isoformat()
-                                
-                                st.markdown("""
-                                <div class="success-message">
-                                    <strong>✅ Success!</strong> PDF generated successfully! Review the preview below and download when ready.
-                                </div>
-                                """, unsafe_allow_html=True)
-                                st.balloons()
-                                
-                        except Exception as e:
-                            st.markdown(f"""
-                            <div class="error-message">
-                                <strong>❌ Error:</strong> Failed to generate PDF. Please try again.
+                    # Any click (e.g. Cancel) reruns the script; the next run cancels this token
+                    cancel_token = CancellationToken()
+                    st.session_state.pdf_cancel_token = cancel_token
+                    st.button("⏹️ Cancel", key="cancel_pdf_generation", use_container_width=True)
+                    progress_bar = st.progress(0.0, text="Starting PDF generation...")
+                    
+                    try:
+                        # Use context manager for proper cleanup
+                        with PDFGenerator() as pdf_gen:
+                            pdf_buffer = pdf_gen.generate_pdf(
+                                st.session_state.question_id,
+                                st.session_state.prompt_text,
+                                st.session_state.model1,
+                                st.session_state.model2,
+                                st.session_state.model1_images,
+                                st.session_state.model2_images,
+                                st.session_state.get('prompt_image'),
+                                progress_callback=make_generation_progress_callback(progress_bar, cancel_token),
+                                cancel_token=cancel_token
+                            )
+                            
+                            # Store in session state with generation timestamp
+                            st.session_state.pop('pdf_cancel_token', None)
+                            st.session_state.pdf_buffer = pdf_buffer
+                            st.session_state.pdf_generated = True
+                            st.session_state.pdf_generation_time = datetime.now().isoformat()
+                            st.session_state.pdf_sha256 = hashlib.sha256(pdf_buffer.getvalue()).hexdigest()
+                            # The checkbox is gone by Step 4, so keep its value outside the widget key
+                            st.session_state.speculative_upload_allowed = st.session_state.get('speculative_upload_enabled', True)
+                            start_speculative_upload_if_ready()
+                            
+                            for warning in pdf_gen.warnings:
+                                st.warning(f"⚠️ {warning}")
+                            
+                            st.markdown("""
+                            <div class="success-message">
+                                <strong>✅ Success!</strong> PDF generated successfully! Review the preview below and download when ready.
                             </div>
                             """, unsafe_allow_html=True)
-                            # Don't set pdf_generated to True on failure
+                            st.balloons()
+                            
+                    except GenerationCancelled:
+                        st.session_state.pop('pdf_cancel_token', None)
+                        st.info("⏹️ PDF generation cancelled.")
+                    except Exception as e:
+                        st.session_state.pop('pdf_cancel_token', None)
+                        st.error(f"{str(e)}")
+                        st.error(f"Traceback: {traceback.format_exc()}")
+                        st.markdown(f"""
+                        <div class="error-message">
+                            <strong>❌ Error:</strong> Failed to generate PDF. Please try again.
+                        </div>
+                        """, unsafe_allow_html=True)
+                        # Don't set pdf_generated to True on failure
         else:
             # PDF already generated - show status and regeneration option
             generation_time = st.session_state.get('pdf_generation_time', 'Unknown')
@@ -2016,6 +1828,7 @@ def main():
                             st.session_state.drive_url_generated = False
                             st.session_state.drive_url = ""
                             st.session_state.uploaded_to_drive = False
+                            cancel_speculative_upload()
                             if 'pdf_buffer' in st.session_state:
                                 del st.session_state.pdf_buffer
                             st.success("🔄 Ready to regenerate PDF")
@@ -2024,6 +1837,7 @@ def main():
                     with col_b:
                         if st.button("🆕 Start New Session", type="primary", use_container_width=True):
                             # Clear entire session state except current page
+                            cancel_speculative_upload()
                             keys_to_clear = [key for key in st.session_state.keys() if key not in ['current_page']]
                             for key in keys_to_clear:
                                 del st.session_state[key]
@@ -2065,6 +1879,20 @@ def main():
                     use_container_width=True
                 )
         
+        with st.expander("📦 Save Inputs as Bundle", expanded=False):
+            st.caption("Package the metadata, SOT fields and screenshots in their current order so this deck can be re-rendered later, in the app or with `sxs_cli.py render-bundle`.")
+            if st.button("📦 Build Bundle", type="secondary"):
+                st.session_state.bundle_bytes = bundle_to_bytes(build_session_bundle())
+            if st.session_state.get('bundle_bytes'):
+                bundle_name = generate_filename(st.session_state.model1, st.session_state.model2)
+                st.download_button(
+                    label=f"📥 Download Bundle ({len(st.session_state.bundle_bytes) / 1024:.1f} KB)",
+                    data=st.session_state.bundle_bytes,
+                    file_name=bundle_name[:-len(".pdf")] + BUNDLE_EXTENSION,
+                    mime="application/zip",
+                    use_container_width=True
+                )
+        
         # Show next step button if completed
         show_next_step_button("PDF Generation")
     
@@ -2093,35 +1921,13 @@ def main():
         pdf_data = st.session_state.pdf_buffer.read()
         file_size_kb = len(pdf_data) / 1024
         
-        # Email Input Row
-        col1, col2, col3 = st.columns([2, 6, 2])
-        with col1:
-            st.markdown('<p class="form-label">Email Address:</p>', unsafe_allow_html=True)
-        with col2:
-            user_email = st.text_input(
-                "",
-                placeholder="Please input your email address",
-                key="email_input_form",
-                label_visibility="collapsed"
-            )
-        with col3:
-            if user_email:
-                if validate_email_format(user_email):
-                    # Use simplified validation for form display
-                    is_email_valid, _, _ = validate_email_with_attempts(user_email)
-                    if is_email_valid:
-                        st.markdown('<div class="validation-status validation-success">✓ Valid</div>', unsafe_allow_html=True)
-                        st.session_state.email_validated = True
-                        st.session_state.user_email = user_email
-                    else:
-                        st.markdown('<div class="validation-status validation-error">✗ Invalid</div>', unsafe_allow_html=True)
-                        st.session_state.email_validated = False
-                else:
-                    st.markdown('<div class="validation-status validation-error">✗ Format</div>', unsafe_allow_html=True)
-                    st.session_state.email_validated = False
-            else:
-                st.markdown('<div class="validation-status">⚪ Pending</div>', unsafe_allow_html=True)
-                st.session_state.email_validated = False
+        # Email Input Row (fragment); the flag must not outlive this call, even on a rerun or stop
+        st.session_state.email_row_full_run = True
+        try:
+            email_input_row()
+        finally:
+            st.session_state.email_row_full_run = False
+        user_email = st.session_state.get('email_input_form', '')
         
         st.markdown('<hr style="margin: 1rem 0; border: 1px solid rgba(255,255,255,0.1);">', unsafe_allow_html=True)
         
@@ -2214,7 +2020,16 @@ def main():
                             'timestamp': datetime.now().isoformat()
                         }
                         
-                        drive_url = generate_drive_url(st.session_state.pdf_buffer, filename, metadata)
+                        upload_progress = st.progress(0.0)
+                        
+                        def on_upload_progress(bytes_sent: int, total_bytes: int):
+                            upload_progress.progress(
+                                bytes_sent / total_bytes if total_bytes else 1.0,
+                                text=f"{bytes_sent // 1024} / {total_bytes // 1024} KB"
+                            )
+                        
+                        drive_url = generate_drive_url(st.session_state.pdf_buffer, filename, metadata, on_upload_progress)
+                        show_rate_limit_wait()
                         
                         if drive_url:
                             st.session_state.drive_url = drive_url
@@ -2309,18 +2124,19 @@ def main():
         
         # Add spacing after the form
         st.markdown("<br>", unsafe_allow_html=True)
-            
-            col1, col2, col3 = st.columns([1, 2, 1])
-            
-            with col2:
-                if st.button("🔄 Start New Comparison", type="primary"):
-                    # Clear session state
-                    keys_to_clear = [key for key in st.session_state.keys() if key not in ['current_page']]
-                    for key in keys_to_clear:
-                        del st.session_state[key]
-                    st.session_state.current_page = "Metadata Input"
-                    st.success("🆕 Ready for a new comparison!")
-                    st.rerun()
+        
+        col1, col2, col3 = st.columns([1, 2, 1])
+        
+        with col2:
+            if st.button("🔄 Start New Comparison", type="primary"):
+                # Clear session state
+                cancel_speculative_upload()
+                keys_to_clear = [key for key in st.session_state.keys() if key not in ['current_page']]
+                for key in keys_to_clear:
+                    del st.session_state[key]
+                st.session_state.current_page = "Metadata Input"
+                st.success("🆕 Ready for a new comparison!")
+                st.rerun()
     
     elif page == "Help":
         st.header("❓ Help & Documentation")
@@ -0,0 +1,197 @@
+"""Question ID parsing, one at a time or in bulk (no Streamlit).
+
+Question IDs look like
+``{hash}+bard_data+{TASK_ID}+INTERNAL+en:{number}`` and may embed the
+language (``human_eval_en-US+INTERNAL``) and project type
+(``experience_monolingual_human_eval``). Patterns are compiled once at
+import, and parsed IDs are cached, so IDs that repeat across a
+submissions export are only parsed once.
+
+Reconcile a submissions export against an SOT export offline:
+
+    python sxs_cli.py reconcile submissions.csv --sot sot.csv --output issues.csv
+"""
+
+import csv
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# ============================================================================
+# CONSTANTS & CONFIGURATION
+# ============================================================================
+
+LANGUAGE_PATTERN = re.compile(r'human_eval_([a-z]{2}-[A-Z]{2}|[a-z]{2}-\d{3}|[a-z]{2}-[a-z]{2})\+INTERNAL')
+PROJECT_PATTERN = re.compile(r'experience_([a-z_]+)_human_eval')
+TASK_ID_PATTERN = re.compile(r'bard_data\+([^+]+)\+INTERNAL')
+TASK_ID_FALLBACK_PATTERNS = (
+    re.compile(r'bard_data\+([^+]+)\+'),  # Lenient pattern
+    re.compile(r'coach_P\d+[^+]+'),       # coach_P pattern matching
+)
+MODEL_SEPARATORS = (" vs ", " vs. ")
+
+PROJECT_TYPE_MAPPING = {
+    'monolingual': 'Monolingual',
+    'audio_out': 'Audio Out',
+    'mixed': 'Mixed',
+    'code_mixed': 'Mixed',
+    'language_learning': 'Language Learning',
+    'learning_and_academic_help': 'Learning & Academic Help'
+}
+
+QUESTION_ID_CACHE_SIZE = 65536
+
+# ============================================================================
+# SINGLE-ID PARSING
+# ============================================================================
+
+def parse_question_id(question_id: str) -> Tuple[Optional[str], Optional[str]]:
+    """Parse Question ID to extract language and project type using regex patterns"""
+    language = None
+    project_type = None
+
+    try:
+        language_match = LANGUAGE_PATTERN.search(question_id)
+        if language_match:
+            language = language_match.group(1)
+
+        project_match = PROJECT_PATTERN.search(question_id)
+        if project_match:
+            extracted_project = project_match.group(1)
+            for key, value in PROJECT_TYPE_MAPPING.items():
+                if key in extracted_project:
+                    project_type = value
+                    break
+
+    except Exception as e:
+        print(f"Error parsing Question ID: {e}")
+
+    return language, project_type
+
+def extract_task_id_from_question_id(question_id: str) -> Optional[str]:
+    """Extract Task ID from Question ID using pattern matching"""
+    try:
+        match = TASK_ID_PATTERN.search(question_id)
+        if match and match[1]:
+            return match[1].strip()
+
+        for alt_pattern in TASK_ID_FALLBACK_PATTERNS:
+            alt_match = alt_pattern.search(question_id)
+            if alt_match:
+                return alt_match[0].replace('bard_data+', '').replace('+', '').strip()
+
+        return None
+    except Exception as e:
+        print(f"Error extracting Task ID: {e}")
+        return None
+
+def parse_model_combination(model_comparison: str) -> Tuple[Optional[str], Optional[str]]:
+    """Parse model combination string into individual models"""
+    try:
+        if not model_comparison:
+            return None, None
+
+        # Common patterns: "Model1 vs Model2", "Model1 vs. Model2"
+        for separator in MODEL_SEPARATORS:
+            if separator in model_comparison:
+                parts = model_comparison.split(separator)
+                break
+        else:
+            return None, None
+
+        if len(parts) == 2:
+            return parts[0].strip(), parts[1].strip()
+
+        return None, None
+    except Exception:
+        return None, None
+
+# ============================================================================
+# BATCH PARSING
+# ============================================================================
+
+@dataclass(frozen=True)
+class QuestionIdInfo:
+    """Everything that can be read out of one Question ID"""
+    question_id: str
+    task_id: Optional[str]
+    language: Optional[str]
+    project_type: Optional[str]
+
+@lru_cache(maxsize=QUESTION_ID_CACHE_SIZE)
+def parse_question_id_info(question_id: str) -> QuestionIdInfo:
+    """Parse task ID, language and project type at once; cached per ID"""
+    language, project_type = parse_question_id(question_id)
+    return QuestionIdInfo(question_id, extract_task_id_from_question_id(question_id), language, project_type)
+
+def parse_question_ids(question_ids: Iterable[str]) -> List[QuestionIdInfo]:
+    """Parse many Question IDs, in input order; repeated IDs hit the cache"""
+    return [parse_question_id_info((question_id or "").strip()) for question_id in question_ids]
+
+# ============================================================================
+# OFFLINE RECONCILIATION
+# ============================================================================
+
+def _normalize_header(name: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '_', (name or "").strip().lower()).strip('_')
+
+def read_csv_rows(path: str) -> List[Dict[str, str]]:
+    """Read a CSV export with headers normalized ("Question ID" -> question_id)"""
+    with open(path, newline="", encoding="utf-8-sig") as csv_file:
+        return [
+            {_normalize_header(key): (value or "").strip() for key, value in row.items() if key}
+            for row in csv.DictReader(csv_file)
+        ]
+
+def build_sot_lookup(sot_rows: Iterable[Dict[str, str]]) -> Dict[str, Dict[str, str]]:
+    """Index SOT rows by task ID"""
+    return {row["task_id"]: row for row in sot_rows if row.get("task_id")}
+
+def reconcile_submissions(submissions: Iterable[Dict[str, str]],
+                          sot_lookup: Dict[str, Dict[str, str]]) -> List[dict]:
+    """Compare logged submissions with the SOT; returns one dict per issue found"""
+    submissions = list(submissions)
+    infos = parse_question_ids(row.get("question_id", "") for row in submissions)
+    issues = []
+
+    def report(row_number: int, info: QuestionIdInfo, issue: str, logged: str = "", expected: str = ""):
+        issues.append({
+            "row": row_number,
+            "question_id": info.question_id,
+            "task_id": info.task_id or "",
+            "issue": issue,
+            "logged": logged,
+            "expected": expected
+        })
+
+    for row_number, (row, info) in enumerate(zip(submissions, infos), start=2):  # Row 1 is the header
+        if not info.task_id:
+            report(row_number, info, "no_task_id")
+            continue
+
+        sot_row = sot_lookup.get(info.task_id)
+        if sot_row is None:
+            report(row_number, info, "not_in_sot")
+            continue
+
+        # Only logged values: the project type parsed from a Question ID uses another taxonomy than the SOT
+        for field_name in ("language", "project_type"):
+            logged = row.get(field_name, "")
+            expected = sot_row.get(field_name, "")
+            if expected and logged and logged != expected:
+                report(row_number, info, f"{field_name}_mismatch", logged, expected)
+
+        sot_models = parse_model_combination(sot_row.get("model_comparison", ""))
+        logged_models = (row.get("model1", ""), row.get("model2", ""))
+        if all(sot_models) and all(logged_models) and logged_models != sot_models:
+            report(row_number, info, "model_mismatch", " vs ".join(logged_models), " vs ".join(sot_models))
+
+    return issues
+
+def write_issues_csv(issues: List[dict], path: str):
+    """Write reconciliation issues as a CSV report"""
+    with open(path, "w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=["row", "question_id", "task_id", "issue", "logged", "expected"])
+        writer.writeheader()
+        writer.writerows(issues)
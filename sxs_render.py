@@ -0,0 +1,933 @@
+"""Headless rendering core for SxS comparison decks.
+
+Everything needed to turn a question ID, prompt, model names and screenshots
+into the standard 16:9 PDF deck (or slide thumbnails) lives here. The module
+never imports Streamlit: problems are raised as exceptions or collected in
+``PDFGenerator.warnings`` so the Streamlit app, batch jobs and worker processes
+can all share it. Each call builds its own PDFGenerator, which keeps rendering
+thread- and process-safe.
+"""
+
+import io
+import os
+import re
+import time
+import hashlib
+import tempfile
+import threading
+import functools
+import traceback
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, BinaryIO, Tuple, Callable
+
+# PIL and ReportLab are imported where they are first needed so importing this
+# module (e.g. in every pool worker) stays cheap; see check_startup_budget.py
+
+# ============================================================================
+# CONSTANTS & CONFIGURATION
+# ============================================================================
+
+# Points per inch (same value as reportlab.lib.units.inch)
+INCH = 72.0
+
+# Slide preview configuration
+PREVIEW_THUMB_WIDTH = 360  # pixels
+UPLOAD_THUMB_WIDTH = 480   # pixels, for screenshot lists on the upload page
+UPLOAD_THUMB_QUALITY = 80  # JPEG quality of upload thumbnails
+PREVIEW_FONT_FILES = {
+    "regular": ["DejaVuSans.ttf", "Arial.ttf", "Helvetica.ttc"],
+    "bold": ["DejaVuSans-Bold.ttf", "Arial Bold.ttf", "Helvetica.ttc"],
+}
+
+# ============================================================================
+# CONTENT-ADDRESSED TEMP FILES
+# ============================================================================
+
+# ReportLab names embedded images after their file path. Temp files are
+# therefore named after their content, so within one process (e.g. the
+# Streamlit server) identical inputs render to identical PDF bytes, and a
+# screenshot used twice in one deck is embedded only once. Files are shared by
+# all generators in this process. A file is deleted when the last generator
+# using it releases it.
+_temp_refcounts: Dict[str, int] = {}
+_temp_lock = threading.Lock()
+
+def acquire_content_temp_file(data: bytes, suffix: str) -> str:
+    """Path of a temp file holding data; pair with release_content_temp_file"""
+    directory = os.path.join(tempfile.gettempdir(), f"sxs_render_{os.getpid()}")
+    path = os.path.join(directory, hashlib.sha256(data).hexdigest()[:32] + suffix)
+    with _temp_lock:
+        if not _temp_refcounts.get(path):
+            os.makedirs(directory, exist_ok=True)
+            with open(path, "wb") as temp_file:
+                temp_file.write(data)
+        _temp_refcounts[path] = _temp_refcounts.get(path, 0) + 1
+    return path
+
+def release_content_temp_file(path: str):
+    """Drop one reference; the file is removed with the last one"""
+    with _temp_lock:
+        remaining = _temp_refcounts.get(path, 0) - 1
+        if remaining > 0:
+            _temp_refcounts[path] = remaining
+            return
+        _temp_refcounts.pop(path, None)
+        if os.path.exists(path):
+            os.unlink(path)
+        if not _temp_refcounts:
+            try:
+                os.rmdir(os.path.dirname(path))
+            except OSError:
+                pass
+
+# ============================================================================
+# PDF GENERATION CLASS
+# ============================================================================
+
+class RenderError(Exception):
+    """Raised when a deck cannot be rendered"""
+
+class GenerationCancelled(Exception):
+    """Raised when a PDF generation is cancelled between slides"""
+
+class CancellationToken:
+    """Thread-safe flag for cooperatively cancelling a running PDF generation"""
+    
+    def __init__(self):
+        self._event = threading.Event()
+    
+    def cancel(self):
+        self._event.set()
+    
+    @property
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+    
+    def raise_if_cancelled(self):
+        if self.is_cancelled:
+            raise GenerationCancelled("PDF generation was cancelled")
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    """Progress report emitted by PDFGenerator.generate_pdf"""
+    stage: str      # "prepared", "drawn" or "saved"
+    current: int    # Items completed in this stage
+    total: int      # Items in this stage
+    label: str = ""
+
+@dataclass
+class RenderResult:
+    """Outcome of render_deck, safe to return across process boundaries"""
+    success: bool
+    pdf_bytes: bytes = b""
+    warnings: List[str] = field(default_factory=list)
+    error: str = ""
+    elapsed_seconds: float = 0.0
+    cancelled: bool = False
+
+class PDFGenerator:
+    """Production-grade PDF generator with Google Slides format and company branding"""
+    
+    def __init__(self):
+        from reportlab.lib.colors import HexColor
+        
+        # Google Slides 16:9 format dimensions (720 × 405 points)
+        self.page_width = 10 * INCH  # 720 points
+        self.page_height = 5.625 * INCH  # 405 points
+        self.slide_format = (self.page_width, self.page_height)
+        
+        # Safe margins
+        self.safe_margin = 0.25 * INCH  # Reduced from 0.5" to 0.25"
+        self.content_width = self.page_width - (2 * self.safe_margin)
+        self.content_height = self.page_height - (2 * self.safe_margin)
+        
+        # Company logo dimensions and position (icon)
+        self.logo_size = 0.5 * INCH    # Bigger square logo (36 points)
+        self.logo_margin = 0.2 * INCH  # Margin from edge
+        
+        # Color scheme (Google Slides Material Design)
+        self.primary_color = HexColor('#4a86e8')  # Cornflower Blue
+        self.text_color = HexColor('#1f2937')     # Dark Gray
+        self.light_gray = HexColor('#f3f4f6')     # Light Gray
+        
+        self.temp_files = []
+        self.company_logo_path = None
+        
+        # Non-fatal problems (unreadable images, cleanup failures) for the caller to surface
+        self.warnings = []
+        
+        # Download and cache company logo
+        self._setup_company_logo()
+    
+    def _setup_company_logo(self):
+        """Setup the Invisible company icon (circular logo only)"""
+        try:
+            from PIL import Image, ImageDraw
+            
+            # Create the Invisible icon without text
+            # Create a clean circular icon version
+            icon_size = 72
+            logo_img = Image.new('RGBA', (icon_size, icon_size), (255, 255, 255, 0))  # Transparent background
+            draw = ImageDraw.Draw(logo_img)
+            
+            # Draw the circular logo (based on the SVG design)
+            circle_margin = 4
+            circle_size = icon_size - (2 * circle_margin)
+            
+            # Draw outer circle (dark)
+            draw.ellipse([circle_margin, circle_margin, 
+                         circle_margin + circle_size, circle_margin + circle_size], 
+                        fill=(15, 15, 15, 255), outline=None)
+            
+            # Draw inner square (white) - represents the square cutout in the SVG
+            inner_margin = 12
+            inner_size = circle_size - (2 * inner_margin)
+            inner_x = circle_margin + inner_margin
+            inner_y = circle_margin + inner_margin
+            
+            draw.rectangle([inner_x, inner_y, inner_x + inner_size, inner_y + inner_size], 
+                         fill=(255, 255, 255, 255))
+            
+            # Save logo
+            logo_bytes = io.BytesIO()
+            logo_img.save(logo_bytes, format='PNG')
+            
+            self.company_logo_path = acquire_content_temp_file(logo_bytes.getvalue(), '.png')
+            self.temp_files.append(self.company_logo_path)
+            
+        except Exception as e:
+            self.warnings.append(f"Could not create company logo: {e}")
+            self.company_logo_path = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.cleanup()
+    
+    def cleanup(self):
+        """Clean up temporary files"""
+        for temp_file in self.temp_files:
+            try:
+                release_content_temp_file(temp_file)
+            except Exception as e:
+                self.warnings.append(f"Could not clean up temp file: {e}")
+        self.temp_files = []
+    
+    def prepare_image(self, image_file: BinaryIO) -> Optional[str]:
+        """Convert uploaded image to ReportLab compatible format"""
+        try:
+            from PIL import Image
+            
+            # Reset file pointer
+            image_file.seek(0)
+            
+            # Open image with PIL
+            img = Image.open(image_file)
+            
+            # Convert to RGB if necessary
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+            
+            # Create temporary file
+            jpeg_bytes = io.BytesIO()
+            img.save(jpeg_bytes, format='JPEG', quality=95, optimize=True)
+            
+            temp_path = acquire_content_temp_file(jpeg_bytes.getvalue(), '.jpg')
+            self.temp_files.append(temp_path)
+            return temp_path
+            
+        except Exception as e:
+            self.warnings.append(f"Error preparing image: {str(e)}")
+            return None
+    
+    def draw_company_logo(self, canvas_obj):
+        """Draw the Invisible company icon in the bottom right corner"""
+        if not self.company_logo_path:
+            return
+            
+        try:
+            # Position icon in bottom right corner
+            logo_x = self.page_width - self.logo_size - self.logo_margin
+            logo_y = self.logo_margin
+            
+            # Draw logo as square icon
+            canvas_obj.drawImage(
+                self.company_logo_path,
+                logo_x,
+                logo_y,
+                width=self.logo_size,
+                height=self.logo_size,
+                preserveAspectRatio=True
+            )
+            
+        except Exception as e:
+            message = f"Could not draw company logo: {e}"
+            if message not in self.warnings:  # Drawn on every slide; report it once
+                self.warnings.append(message)
+    
+    def draw_slide_background(self, canvas_obj):
+        """Draw slide background with Google Slides styling"""
+        from reportlab.lib.colors import HexColor
+        
+        # Set background to white
+        canvas_obj.setFillColor(HexColor('#ffffff'))
+        canvas_obj.rect(0, 0, self.page_width, self.page_height, fill=1, stroke=0)
+        
+        # Optional: Add subtle border
+        canvas_obj.setStrokeColor(HexColor('#e5e7eb'))
+        canvas_obj.setLineWidth(1)
+        canvas_obj.rect(0, 0, self.page_width, self.page_height, fill=0, stroke=1)
+
+    def draw_text_with_wrapping(self, canvas_obj, text: str, x: float, y: float, 
+                           max_width: float, font_name: str = "Helvetica", 
+                           font_size: int = 18):
+        return self.draw_wrapped_text(canvas_obj, text, x, y, max_width, 
+                                 font_name, font_size, line_height_factor=1.2)
+        
+        # Split text into words
+        words = text.split(' ')
+        lines = []
+        current_line = ""
+        
+        for word in words:
+            test_line = current_line + word + " "
+            if canvas_obj.stringWidth(test_line, font_name, font_size) < max_width:
+                current_line = test_line
+            else:
+                if current_line:
+                    lines.append(current_line.strip())
+                    current_line = word + " "
+                else:
+                    lines.append(word)
+                    current_line = ""
+        
+        if current_line:
+            lines.append(current_line.strip())
+        
+        # Draw lines with proper spacing for slides
+        current_y = y
+        line_height = font_size * 1.2
+        
+        for line in lines:
+            canvas_obj.drawString(x, current_y, line)
+            current_y -= line_height
+        
+        return current_y
+    
+    def draw_centered_text(self, canvas_obj, text: str, y: float, 
+                          font_name: str = "Helvetica-Bold", font_size: int = 48,
+                          color: "HexColor" = None):
+        """Draw centered text with slide-appropriate styling"""
+        if color is None:
+            color = self.text_color
+            
+        canvas_obj.setFont(font_name, font_size)
+        canvas_obj.setFillColor(color)
+        
+        text_width = canvas_obj.stringWidth(text, font_name, font_size)
+        x = (self.page_width - text_width) / 2
+        canvas_obj.drawString(x, y, text)
+    
+    def draw_slide_title(self, canvas_obj, text: str, y: float = None):
+        """Draw slide title with consistent positioning"""
+        if y is None:
+            y = self.page_height - self.safe_margin - 60
+        
+        self.draw_centered_text(
+            canvas_obj, 
+            text, 
+            y, 
+            font_name="Helvetica-Bold", 
+            font_size=40,
+            color=self.primary_color
+        )
+    
+    def draw_image_centered(self, canvas_obj, image_path: str, max_width: float = None, 
+                           max_height: float = None):
+        """Draw image centered on slide with proper scaling for 16:9 format"""
+        try:
+            from PIL import Image
+            
+            # Get image dimensions
+            img = Image.open(image_path)
+            img_width, img_height = img.size
+            
+            # Set default max dimensions for slide format
+            if max_width is None:
+                max_width = self.content_width
+            if max_height is None:
+                max_height = self.content_height
+            
+            # Calculate scaling to fit within slide bounds
+            if img_width > max_width or img_height > max_height:
+                ratio = min(max_width / img_width, max_height / img_height)
+                new_width = int(img_width * ratio)
+                new_height = int(img_height * ratio)
+            else:
+                new_width = img_width
+                new_height = img_height
+            
+            # Center the image on the slide
+            x = (self.page_width - new_width) / 2
+            y = (self.page_height - new_height) / 2
+            
+            # Draw image
+            canvas_obj.drawImage(image_path, x, y, width=new_width, height=new_height)
+            
+        except Exception as e:
+            self.warnings.append(f"Error drawing image: {str(e)}")
+    
+    def create_title_slide(self, canvas_obj, question_id: str, prompt: str, 
+                      prompt_image: Optional[BinaryIO] = None):
+        
+        # Draw background
+        self.draw_slide_background(canvas_obj)
+        
+        # Start from top with better spacing
+        y_pos = self.page_height - self.safe_margin - 15
+        
+        # === QUESTION ID SECTION ===
+        canvas_obj.setFont("Helvetica-Bold", 14)
+        canvas_obj.setFillColor(self.primary_color)
+        canvas_obj.drawString(self.safe_margin, y_pos, "ID:")
+        y_pos -= 18
+        
+        # Write question ID with multi-line wrapping
+        y_pos = self.draw_wrapped_text(canvas_obj, question_id, 
+                                    self.safe_margin, y_pos, 
+                                    self.content_width, 
+                                    font_name="Helvetica", font_size=9,
+                                    line_height_factor=1.1)
+        y_pos -= 25  # spacing after ID
+        
+        # === DETERMINE LAYOUT STRUCTURE ===
+        # Calculate column dimensions based on whether image is present
+        if prompt_image is not None:
+            # Two-column layout: 60% text, 38% image, 2% gap
+            text_column_width = self.content_width * 0.60
+            gap_width = self.content_width * 0.02
+            image_column_width = self.content_width * 0.38
+            image_column_x = self.safe_margin + text_column_width + gap_width
+        else:
+            # Single column for text when no image
+            text_column_width = self.content_width
+            image_column_width = 0
+            image_column_x = 0
+        
+        # Store starting Y position for columns
+        content_start_y = y_pos
+        
+        # === LEFT COLUMN: PROMPT TEXT ===
+        canvas_obj.setFont("Helvetica-Bold", 14)
+        canvas_obj.setFillColor(self.primary_color)
+        canvas_obj.drawString(self.safe_margin, y_pos, "Initial Prompt:")
+        y_pos -= 20
+        
+        # Write wrapped prompt text in left column
+        prompt_end_y = self.draw_wrapped_text(canvas_obj, prompt,
+                                            self.safe_margin, y_pos,
+                                            text_column_width,
+                                            font_name="Helvetica", font_size=12,
+                                            line_height_factor=1.3)
+        
+        # === RIGHT COLUMN: PROMPT IMAGE ===
+        if prompt_image is not None:
+            available_height = content_start_y - self.safe_margin - 60  # space for Inv logo
+            self.draw_prompt_image_in_column(canvas_obj, prompt_image,
+                                        image_column_x, content_start_y - 20,  # Start below "Initial Prompt:"
+                                        image_column_width,
+                                        available_height)
+        
+        # Use company logo
+        self.draw_company_logo(canvas_obj)
+
+    def draw_wrapped_text(self, canvas_obj, text: str, x: float, y: float, 
+                        max_width: float, font_name: str = "Helvetica", 
+                        font_size: int = 12, line_height_factor: float = 1.2):
+        """Draw text with automatic line wrapping and return the final Y position"""
+        canvas_obj.setFont(font_name, font_size)
+        canvas_obj.setFillColor(self.text_color)
+        
+        # Handle very long words by breaking them if necessary
+        def break_long_word(word, max_word_width):
+            """Break a word that's too long to fit on one line"""
+            if canvas_obj.stringWidth(word, font_name, font_size) <= max_word_width:
+                return [word]
+            
+            broken_parts = []
+            current_part = ""
+            
+            for char in word:
+                test_part = current_part + char
+                if canvas_obj.stringWidth(test_part, font_name, font_size) <= max_word_width:
+                    current_part = test_part
+                else:
+                    if current_part:
+                        broken_parts.append(current_part)
+                    current_part = char
+            
+            if current_part:
+                broken_parts.append(current_part)
+            
+            return broken_parts
+        
+        # Split text into words and handle wrapping
+        words = text.split()
+        lines = []
+        current_line = ""
+        
+        for word in words:
+            # Check if word itself is too long
+            if canvas_obj.stringWidth(word, font_name, font_size) > max_width:
+                # Add current line if it has content
+                if current_line.strip():
+                    lines.append(current_line.strip())
+                    current_line = ""
+                
+                # Break the long word
+                broken_words = break_long_word(word, max_width)
+                for i, broken_word in enumerate(broken_words):
+                    if i == len(broken_words) - 1:  # Last part
+                        current_line = broken_word + " "
+                    else:
+                        lines.append(broken_word)
+            else:
+                # Normal word processing
+                test_line = current_line + word + " "
+                if canvas_obj.stringWidth(test_line, font_name, font_size) <= max_width:
+                    current_line = test_line
+                else:
+                    if current_line.strip():
+                        lines.append(current_line.strip())
+                    current_line = word + " "
+        
+        # Add the last line
+        if current_line.strip():
+            lines.append(current_line.strip())
+        
+        # Draw all lines
+        current_y = y
+        line_height = font_size * line_height_factor
+        
+        for line in lines:
+            canvas_obj.drawString(x, current_y, line)
+            current_y -= line_height
+        
+        return current_y
+
+    def draw_prompt_image_in_column(self, canvas_obj, image_file: BinaryIO, 
+                                x: float, y: float, column_width: float, 
+                                available_height: float):
+        """Draw prompt image within the specified column bounds with proper scaling"""
+        try:
+            # Reset file pointer and prepare image
+            image_file.seek(0)
+            image_data = image_file.read()
+            
+            if not image_data:
+                self.warnings.append("Prompt image is empty; it was left out")
+                return
+                
+            # Create temporary file for the image
+            temp_image_path = acquire_content_temp_file(image_data, '.jpg')
+            
+            # Add to cleanup list
+            self.temp_files.append(temp_image_path)
+            
+            # Verify file and get image dimensions
+            if not os.path.exists(temp_image_path) or os.path.getsize(temp_image_path) == 0:
+                self.warnings.append("Could not prepare the prompt image; it was left out")
+                return
+                
+            # Open and process the image
+            from PIL import Image
+            img = Image.open(temp_image_path)
+            img_width, img_height = img.size
+            
+            # Calculate scaling to fit within column bounds
+            width_ratio = column_width / img_width
+            height_ratio = available_height / img_height
+            scale_ratio = min(width_ratio, height_ratio, 1.0)  # Don't upscale beyond original size
+            
+            new_width = img_width * scale_ratio
+            new_height = img_height * scale_ratio
+            
+            # Center image horizontally within column, align to top vertically
+            image_x = x + (column_width - new_width) / 2
+            image_y = y - new_height  # Align to top of available space
+            
+            # Ensure image doesn't go below bottom margin
+            min_y = self.safe_margin + 60  # Leave space for Inv logo
+            if image_y < min_y:
+                # Recalculate to fit within available space
+                adjusted_height = y - min_y
+                height_ratio = adjusted_height / img_height
+                scale_ratio = min(width_ratio, height_ratio, 1.0)
+                
+                new_width = img_width * scale_ratio
+                new_height = img_height * scale_ratio
+                image_x = x + (column_width - new_width) / 2
+                image_y = y - new_height
+            
+            # Draw the image
+            canvas_obj.drawImage(temp_image_path, image_x, image_y, 
+                            width=new_width, height=new_height,
+                            preserveAspectRatio=True)
+            
+        except Exception as e:
+            self.warnings.append(f"Error drawing prompt image: {str(e)}")
+    
+    def create_model_title_slide(self, canvas_obj, model_name: str):
+        """Create a model title slide with Google Slides styling"""
+        
+        # Draw background
+        self.draw_slide_background(canvas_obj)
+        
+        # Draw model name in center
+        self.draw_centered_text(
+            canvas_obj, 
+            model_name, 
+            self.page_height / 2, 
+            font_name="Helvetica-Bold", 
+            font_size=56,
+            color=self.primary_color
+        )
+        
+        # Draw company logo
+        self.draw_company_logo(canvas_obj)
+    
+    def create_image_slide(self, canvas_obj, image_path: str):
+        """Create an image slide with Google Slides styling and maximized image space"""
+        
+        # Draw background
+        self.draw_slide_background(canvas_obj)
+        
+        # Draw image centered, maximizing space
+        max_height = self.content_height - 20  # Minimal space for logo
+        max_width = self.content_width - 20    # Small buffer for them aesthetics
+        
+        self.draw_image_centered(canvas_obj, image_path, 
+                               max_width=max_width, 
+                               max_height=max_height)
+        
+        # Draw company logo
+        self.draw_company_logo(canvas_obj)
+    
+    def generate_pdf(self, question_id: str, prompt: str, model1: str, model2: str,
+                    model1_images: List[BinaryIO], model2_images: List[BinaryIO],
+                    prompt_image: Optional[BinaryIO] = None,
+                    progress_callback: Optional[Callable[[ProgressEvent], None]] = None,
+                    cancel_token: Optional[CancellationToken] = None) -> io.BytesIO:
+        """Generate the complete PDF with Google Slides 16:9 format
+        
+        progress_callback receives a ProgressEvent per prepared image, per drawn
+        slide and once after saving. cancel_token is checked between slides and
+        raises GenerationCancelled, discarding the partial document.
+        """
+        
+        def report(stage: str, current: int, total: int, label: str = ""):
+            if progress_callback:
+                progress_callback(ProgressEvent(stage, current, total, label))
+        
+        def check_cancelled():
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+        
+        from reportlab.pdfgen import canvas
+        
+        buffer = io.BytesIO()
+        # invariant: no timestamp or random document ID, so identical inputs give identical bytes
+        c = canvas.Canvas(buffer, pagesize=self.slide_format, invariant=1)
+        
+        try:
+            # Prepare every screenshot first so the drawing pass is pure layout
+            all_images = list(model1_images) + list(model2_images)
+            prepared_paths = []
+            for i, img_file in enumerate(all_images):
+                check_cancelled()
+                prepared_paths.append(self.prepare_image(img_file))
+                report("prepared", i + 1, len(all_images))
+            
+            model1_paths = prepared_paths[:len(model1_images)]
+            model2_paths = prepared_paths[len(model1_images):]
+            
+            # Slide 1: Title slide with ID, prompt, and optional image
+            slides = [("Title", self.create_title_slide, (question_id, prompt, prompt_image))]
+            
+            # Model title slide followed by its image slides (one image per slide)
+            for model_name, image_paths in ((model1, model1_paths), (model2, model2_paths)):
+                slides.append((model_name, self.create_model_title_slide, (model_name,)))
+                for i, temp_image_path in enumerate(image_paths):
+                    # Images that failed to prepare still get their (blank) page
+                    draw_slide = self.create_image_slide if temp_image_path else None
+                    slides.append((f"{model_name} #{i+1}", draw_slide, (temp_image_path,)))
+            
+            for i, (label, draw_slide, args) in enumerate(slides):
+                check_cancelled()
+                if i > 0:
+                    c.showPage()
+                if draw_slide:
+                    draw_slide(c, *args)
+                report("drawn", i + 1, len(slides), label)
+            
+            # Finalize PDF
+            check_cancelled()
+            c.save()
+            buffer.seek(0)
+            report("saved", 1, 1)
+            
+            return buffer
+            
+        except GenerationCancelled:
+            raise
+        except Exception as e:
+            raise RenderError(f"Error generating PDF: {str(e)}") from e
+
+# ============================================================================
+# SLIDE PREVIEW RASTERIZER
+# ============================================================================
+
+@functools.lru_cache(maxsize=64)
+def load_preview_font(font_name: str, pixel_size: int):
+    """Load a PIL font approximating a ReportLab base font at the given pixel size"""
+    from PIL import ImageFont
+    
+    weight = "bold" if "Bold" in font_name else "regular"
+    for candidate in PREVIEW_FONT_FILES[weight]:
+        try:
+            return ImageFont.truetype(candidate, pixel_size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size=pixel_size)
+
+class RasterCanvas:
+    """Minimal stand-in for a ReportLab canvas that paints onto a PIL image.
+    
+    Implements only the canvas calls made by the PDFGenerator slide layouts, so
+    previews reuse the exact same layout code (and line breaks) as the PDF.
+    Coordinates are PDF points with a bottom-left origin.
+    """
+    
+    def __init__(self, page_width: float, page_height: float, scale: float):
+        from PIL import Image, ImageDraw
+        
+        self.page_height = page_height
+        self.scale = scale
+        size = (max(1, round(page_width * scale)), max(1, round(page_height * scale)))
+        self.image = Image.new('RGB', size, (255, 255, 255))
+        self.draw = ImageDraw.Draw(self.image)
+        self._font = load_preview_font("Helvetica", 12)
+        self._fill_color = (0, 0, 0)
+        self._stroke_color = (0, 0, 0)
+        self._line_width = 1
+    
+    @staticmethod
+    def _to_rgb(color) -> Tuple[int, int, int]:
+        return tuple(int(round(channel * 255)) for channel in color.rgb())
+    
+    def _to_pixels(self, x: float, y: float) -> Tuple[int, int]:
+        return round(x * self.scale), round((self.page_height - y) * self.scale)
+    
+    def stringWidth(self, text: str, font_name: str, font_size: float) -> float:
+        from reportlab.pdfbase import pdfmetrics
+        return pdfmetrics.stringWidth(text, font_name, font_size)
+    
+    def setFont(self, font_name: str, font_size: float):
+        self._font = load_preview_font(font_name, max(1, round(font_size * self.scale)))
+    
+    def setFillColor(self, color):
+        self._fill_color = self._to_rgb(color)
+    
+    def setStrokeColor(self, color):
+        self._stroke_color = self._to_rgb(color)
+    
+    def setLineWidth(self, width: float):
+        self._line_width = width
+    
+    def rect(self, x: float, y: float, width: float, height: float, stroke: int = 1, fill: int = 0):
+        left, top = self._to_pixels(x, y + height)
+        right, bottom = self._to_pixels(x + width, y)
+        self.draw.rectangle(
+            [left, top, right - 1, bottom - 1],
+            fill=self._fill_color if fill else None,
+            outline=self._stroke_color if stroke else None,
+            width=max(1, round(self._line_width * self.scale))
+        )
+    
+    def drawString(self, x: float, y: float, text: str):
+        # "ls" anchors at the left baseline, matching ReportLab's drawString
+        self.draw.text(self._to_pixels(x, y), text, font=self._font, fill=self._fill_color, anchor="ls")
+    
+    def drawImage(self, image, x: float, y: float, width: float = None, height: float = None,
+                  preserveAspectRatio: bool = False, **kwargs):
+        from PIL import Image
+        
+        if hasattr(image, 'seek'):
+            image.seek(0)
+        
+        with Image.open(image) as src:
+            if width is None or height is None:
+                width, height = src.size
+            
+            if preserveAspectRatio:
+                # ReportLab centers the image inside the box by default
+                ratio = min(width / src.width, height / src.height)
+                x += (width - src.width * ratio) / 2
+                y += (height - src.height * ratio) / 2
+                width, height = src.width * ratio, src.height * ratio
+            
+            target_size = (max(1, round(width * self.scale)), max(1, round(height * self.scale)))
+            
+            # Let JPEG decode at reduced resolution instead of full size
+            src.draft('RGB', target_size)
+            tile = src.convert('RGBA').resize(target_size, Image.LANCZOS)
+        
+        self.image.paste(tile, self._to_pixels(x, y + height), tile)
+
+class SlidePreviewRenderer(PDFGenerator):
+    """Rasterize individual deck slides with PIL at thumbnail resolution"""
+    
+    def __init__(self, thumb_width: int = PREVIEW_THUMB_WIDTH):
+        super().__init__()
+        self.scale = thumb_width / self.page_width
+    
+    def _new_canvas(self) -> RasterCanvas:
+        return RasterCanvas(self.page_width, self.page_height, self.scale)
+    
+    def render_title_slide(self, question_id: str, prompt: str, 
+                           prompt_image: Optional[BinaryIO] = None) -> "Image.Image":
+        """Render the cover slide (Question ID, prompt and optional prompt image)"""
+        raster = self._new_canvas()
+        self.create_title_slide(raster, question_id, prompt, prompt_image)
+        return raster.image
+    
+    def render_model_title_slide(self, model_name: str) -> "Image.Image":
+        """Render a model brand slide"""
+        raster = self._new_canvas()
+        self.create_model_title_slide(raster, model_name)
+        return raster.image
+    
+    def render_image_slide(self, image_file: BinaryIO) -> "Image.Image":
+        """Render a screenshot slide straight from the uploaded file"""
+        raster = self._new_canvas()
+        image_file.seek(0)
+        self.create_image_slide(raster, image_file)
+        return raster.image
+
+def make_image_thumbnail(image_file: BinaryIO, max_width: int = UPLOAD_THUMB_WIDTH) -> bytes:
+    """Downscale an uploaded image to a small JPEG (transparency flattened onto white)"""
+    from PIL import Image
+    
+    image_file.seek(0)
+    with Image.open(image_file) as src:
+        # Width-bound only; thumbnail() shrinks in place (JPEG draft decode, then reduce)
+        src.thumbnail((max_width, src.height), Image.LANCZOS)
+        thumb = src.convert('RGBA')
+    image_file.seek(0)
+    
+    flattened = Image.new('RGB', thumb.size, (255, 255, 255))
+    flattened.paste(thumb, mask=thumb.getchannel('A'))
+    output = io.BytesIO()
+    flattened.save(output, format='JPEG', quality=UPLOAD_THUMB_QUALITY, optimize=True)
+    return output.getvalue()
+
+def get_content_fingerprint(file_obj: BinaryIO) -> str:
+    """Content hash of an uploaded file, used to key cached previews"""
+    file_obj.seek(0)
+    digest = hashlib.sha1(file_obj.read()).hexdigest()
+    file_obj.seek(0)
+    return digest
+
+def build_slide_preview_plan(question_id: str, prompt: str, model1: str, model2: str,
+                             model1_images: List[BinaryIO], model2_images: List[BinaryIO],
+                             prompt_image: Optional[BinaryIO] = None) -> List[Tuple[str, str, str, tuple]]:
+    """Describe each slide as (caption, fingerprint, kind, args) in PDF order"""
+    def fingerprint(*parts: str) -> str:
+        return hashlib.sha1("\x1f".join(parts).encode('utf-8')).hexdigest()
+    
+    prompt_image_hash = get_content_fingerprint(prompt_image) if prompt_image else ""
+    plan = [(
+        "Title",
+        fingerprint("title", question_id, prompt, prompt_image_hash),
+        "title",
+        (question_id, prompt, prompt_image)
+    )]
+    
+    for model_name, images in ((model1, model1_images), (model2, model2_images)):
+        plan.append((model_name, fingerprint("model_title", model_name), "model_title", (model_name,)))
+        for i, img in enumerate(images):
+            plan.append((
+                f"{model_name} #{i+1}",
+                fingerprint("image", get_content_fingerprint(img)),
+                "image",
+                (img,)
+            ))
+    
+    return plan
+
+# ============================================================================
+# HEADLESS ENTRY POINTS
+# ============================================================================
+
+def generate_filename(model1: str, model2: str) -> str:
+    """Generate a standardized filename for the PDF"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    model1_clean = re.sub(r'[^\w\-_.]', '_', model1)
+    model2_clean = re.sub(r'[^\w\-_.]', '_', model2)
+    return f"SxS_Comparison_{model1_clean}_vs_{model2_clean}_{timestamp}.pdf"
+
+def render_deck(question_id: str, prompt: str, model1: str, model2: str,
+                model1_images: List[BinaryIO], model2_images: List[BinaryIO],
+                prompt_image: Optional[BinaryIO] = None,
+                progress_callback: Optional[Callable[[ProgressEvent], None]] = None,
+                cancel_token: Optional[CancellationToken] = None) -> RenderResult:
+    """Render a complete deck and report the outcome instead of raising"""
+    start_time = time.perf_counter()
+    pdf_gen = PDFGenerator()
+    
+    try:
+        pdf_buffer = pdf_gen.generate_pdf(
+            question_id, prompt, model1, model2,
+            model1_images, model2_images, prompt_image,
+            progress_callback=progress_callback,
+            cancel_token=cancel_token
+        )
+        return RenderResult(
+            success=True,
+            pdf_bytes=pdf_buffer.getvalue(),
+            warnings=pdf_gen.warnings,
+            elapsed_seconds=time.perf_counter() - start_time
+        )
+    except GenerationCancelled as e:
+        return RenderResult(
+            success=False,
+            warnings=pdf_gen.warnings,
+            error=str(e),
+            elapsed_seconds=time.perf_counter() - start_time,
+            cancelled=True
+        )
+    except Exception as e:
+        return RenderResult(
+            success=False,
+            warnings=pdf_gen.warnings,
+            error=f"{str(e)}\n{traceback.format_exc()}",
+            elapsed_seconds=time.perf_counter() - start_time
+        )
+    finally:
+        pdf_gen.cleanup()
+
+def render_slide_png(slide_kind: str, slide_args: tuple, thumb_width: int = PREVIEW_THUMB_WIDTH) -> bytes:
+    """Rasterize one slide from a build_slide_preview_plan entry to PNG bytes"""
+    with SlidePreviewRenderer(thumb_width) as renderer:
+        if slide_kind == "title":
+            image = renderer.render_title_slide(*slide_args)
+        elif slide_kind == "model_title":
+            image = renderer.render_model_title_slide(*slide_args)
+        else:
+            image = renderer.render_image_slide(*slide_args)
+    
+    output = io.BytesIO()
+    image.save(output, format='PNG', optimize=True)
+    return output.getvalue()
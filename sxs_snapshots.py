@@ -0,0 +1,255 @@
+"""Local snapshots of webhook-backed reference data (no Streamlit).
+
+Lookups that would otherwise be one Apps Script round trip per check are
+answered from an in-memory copy. A background thread keeps the copy fresh
+with version checks, so an unchanged sheet costs one small request per
+refresh interval:
+
+    get_roster       {if_version}     -> data: {version, not_modified}
+                                      -> data: {version, emails: [...]}
+    get_sot_changes  {since_version}  -> data: {version, full, rows: [...], removed: [task_id, ...]}
+
+``get_sot_changes`` returns only the SOT rows changed since ``since_version``
+(or every row with ``full`` when the webhook cannot tell), and the SOT index
+is persisted to SQLite, so a restart resumes from the stored version.
+
+A snapshot that could not be refreshed for longer than its ``max_age`` is
+stale, and callers fall back to the webhook. If a webhook deployment does
+not support the action, the snapshot stays empty and every lookup falls back.
+"""
+
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+import time
+from typing import Dict, FrozenSet, Iterable, Optional
+
+from sxs_webhook import is_unsupported_action
+
+# ============================================================================
+# CONSTANTS & CONFIGURATION
+# ============================================================================
+
+ROSTER_REFRESH_SECONDS = 60.0
+ROSTER_MAX_AGE_SECONDS = 10 * 60.0   # Older than this, answers come from the webhook again
+SOT_REFRESH_SECONDS = 120.0
+SOT_MAX_AGE_SECONDS = 24 * 60 * 60.0  # The SOT changes rarely; outages up to a day are answered locally
+SNAPSHOT_RETRY_SECONDS = 15.0        # Wait after a failed refresh
+
+SOT_FIELDS = ("language", "project_type", "model_comparison")
+SOT_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sot_rows (
+    task_id TEXT PRIMARY KEY,
+    language TEXT NOT NULL DEFAULT '',
+    project_type TEXT NOT NULL DEFAULT '',
+    model_comparison TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS sot_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# ============================================================================
+# BACKGROUND SNAPSHOT
+# ============================================================================
+
+class BackgroundSnapshot(ABC):
+    """Reference data refreshed by a background thread; subclasses implement the refresh methods"""
+
+    thread_name = "sxs-snapshot"
+
+    def __init__(self, client, refresh_interval: float, max_age: float):
+        self.client = client  # AppsScriptClient
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.version = ""
+        self.refreshed_at = 0.0   # Last successful refresh (changed or not)
+        self.supported = True
+        self.last_error = ""
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the background refresher (idempotent); the first refresh runs right away"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def is_fresh(self) -> bool:
+        return self.supported and self.refreshed_at > 0 and time.time() - self.refreshed_at <= self.max_age
+
+    def _run(self):
+        while not self._stop.is_set() and self.supported:
+            try:
+                refreshed = self.refresh()
+            except Exception as e:
+                self.last_error = str(e)
+                refreshed = False
+            self._stop.wait(self.refresh_interval if refreshed else SNAPSHOT_RETRY_SECONDS)
+
+    @abstractmethod
+    def refresh(self) -> bool:
+        """Bring the snapshot up to date; returns False when the webhook could not be reached"""
+
+    @abstractmethod
+    def refresh_operation(self) -> dict:
+        """The refresh request as a payload, e.g. for one operation of a batch"""
+
+    @abstractmethod
+    def apply_result(self, result: dict) -> bool:
+        """Apply the webhook's answer to refresh_operation(); False if it failed"""
+
+    def _accept(self, result: dict) -> Optional[dict]:
+        """Data of a successful snapshot response, or None (recording why)"""
+        if not self.client.webhook_url or is_unsupported_action(result):
+            self.supported = False  # Nothing to snapshot: callers keep using per-item checks
+        if not result.get("success"):
+            self.last_error = result.get("message", "Snapshot refresh failed")
+            return None
+        self.last_error = ""
+        return result.get("data", {})
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "supported": self.supported,
+            "fresh": self.is_fresh(),
+            "version": self.version,
+            "age": time.time() - self.refreshed_at if self.refreshed_at else None,
+            "last_error": self.last_error
+        }
+
+# ============================================================================
+# ROSTER SNAPSHOT
+# ============================================================================
+
+def normalize_email(email: str) -> str:
+    return (email or "").strip().lower()
+
+class RosterSnapshot(BackgroundSnapshot):
+    """Authorized emails from the "Alias Emails" tab as an in-memory set"""
+
+    thread_name = "sxs-roster-refresher"
+
+    def __init__(self, client, refresh_interval: float = ROSTER_REFRESH_SECONDS,
+                 max_age: float = ROSTER_MAX_AGE_SECONDS):
+        super().__init__(client, refresh_interval, max_age)
+        self._emails: FrozenSet[str] = frozenset()
+
+    def refresh(self) -> bool:
+        return self.apply_result(self.client.get_roster(self.version))
+
+    def refresh_operation(self) -> dict:
+        return {"action": "get_roster", "if_version": self.version}
+
+    def apply_result(self, result: dict) -> bool:
+        data = self._accept(result)
+        if data is None:
+            return False
+        if not data.get("not_modified"):
+            emails = frozenset(normalize_email(email) for email in data.get("emails", []) if email)
+            with self._lock:
+                self._emails = emails  # Swapped whole, so readers never see a partial roster
+                self.version = str(data.get("version", ""))
+        self.refreshed_at = time.time()
+        return True
+
+    def contains(self, email: str) -> bool:
+        """True only for a listed email in a fresh snapshot; misses go to the webhook"""
+        return self.is_fresh() and normalize_email(email) in self._emails
+
+    def __len__(self) -> int:
+        return len(self._emails)
+
+# ============================================================================
+# SOT INDEX
+# ============================================================================
+
+class SotIndex(BackgroundSnapshot):
+    """SOT rows by task ID, kept in memory and persisted to SQLite"""
+
+    thread_name = "sxs-sot-refresher"
+
+    def __init__(self, db_path: str, client, refresh_interval: float = SOT_REFRESH_SECONDS,
+                 max_age: float = SOT_MAX_AGE_SECONDS):
+        super().__init__(client, refresh_interval, max_age)
+        self.db_path = db_path
+        self._connection = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SOT_INDEX_SCHEMA)
+        self._rows: Dict[str, Dict[str, str]] = {}
+        self._load()
+
+    def _load(self):
+        """Restore the last persisted index, including its version and refresh time"""
+        with self._lock:
+            self._rows = {
+                task_id: dict(zip(SOT_FIELDS, values))
+                for task_id, *values in self._connection.execute(
+                    "SELECT task_id, language, project_type, model_comparison FROM sot_rows"
+                )
+            }
+            meta = dict(self._connection.execute("SELECT key, value FROM sot_meta"))
+        self.version = meta.get("version", "")
+        self.refreshed_at = float(meta.get("refreshed_at", 0) or 0)
+
+    def refresh(self) -> bool:
+        return self.apply_result(self.client.get_sot_changes(self.version))
+
+    def refresh_operation(self) -> dict:
+        return {"action": "get_sot_changes", "since_version": self.version}
+
+    def apply_result(self, result: dict) -> bool:
+        data = self._accept(result)
+        if data is None:
+            return False
+        self.apply_changes(data.get("rows", []), data.get("removed", []),
+                           str(data.get("version", self.version)), bool(data.get("full")))
+        return True
+
+    def apply_changes(self, rows: Iterable[dict], removed: Iterable[str], version: str, full: bool = False):
+        """Merge changed rows (or replace everything when full) in memory and on disk"""
+        changed = {
+            str(row["task_id"]).strip(): {field: str(row.get(field) or "").strip() for field in SOT_FIELDS}
+            for row in rows if row.get("task_id")
+        }
+        refreshed_at = time.time()
+        with self._lock:
+            updated = {} if full else dict(self._rows)
+            for task_id in removed:
+                updated.pop(task_id, None)
+            updated.update(changed)
+
+            self._connection.execute("BEGIN")
+            if full:
+                self._connection.execute("DELETE FROM sot_rows")
+            self._connection.executemany("DELETE FROM sot_rows WHERE task_id = ?", [(task_id,) for task_id in removed])
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO sot_rows (task_id, language, project_type, model_comparison) VALUES (?, ?, ?, ?)",
+                [(task_id, *(row[field] for field in SOT_FIELDS)) for task_id, row in changed.items()]
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO sot_meta (key, value) VALUES (?, ?)",
+                [("version", version), ("refreshed_at", str(refreshed_at))]
+            )
+            self._connection.execute("COMMIT")
+
+            self._rows = updated  # Swapped whole, so readers never see a half-applied refresh
+            self.version = version
+            self.refreshed_at = refreshed_at
+
+    def lookup(self, task_id: Optional[str]) -> Optional[Dict[str, str]]:
+        """SOT fields for a task ID from a fresh index; None means ask the webhook"""
+        if not task_id or not self.is_fresh():
+            return None
+        return self._rows.get(task_id)
+
+    def __len__(self) -> int:
+        return len(self._rows)
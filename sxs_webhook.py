@@ -0,0 +1,925 @@
+"""Google Apps Script webhook client (no Streamlit).
+
+All webhook calls go through one pooled ``requests.Session``. Connections to
+script.google.com are kept alive and reused, so only the first call pays for
+the TCP and TLS handshake. The app builds a single client through its
+``get_apps_script_client`` resource cache, which means every Streamlit session
+shares the same pool. ``requests`` is imported on first use.
+
+Transient failures are retried per action with exponential backoff and full
+jitter. Retried failures are connection errors, 429 and 5xx responses, and
+read timeouts for actions that are safe to repeat.
+
+Each action has its own (connect, read) timeout. A circuit breaker sits in
+front of the webhook: after several calls in a row fail, further calls fail
+fast. After a cool-down, one probe call is let through (half-open). If the
+probe succeeds the circuit closes again; if it fails the circuit re-opens.
+
+PDFs larger than one chunk are uploaded in fixed-size chunks read straight
+from the buffer, so only one chunk is base64-encoded at a time:
+
+    upload_start   {filename, metadata, total_size, sha256}  -> data.upload_id
+    upload_chunk   {upload_id, offset, chunk_base64}         -> data.received
+    upload_status  {upload_id}                               -> data.received
+    upload_finish  {upload_id}                               -> data.drive_url
+
+The webhook only accepts a chunk at its current ``received`` offset, which
+makes chunk retries safe. A failed or interrupted upload of the same bytes
+resumes from the last acknowledged offset. If a webhook deployment does not
+support ``upload_start``, the client falls back to the single ``upload_pdf``
+request. ``sxs_webhook_stub.py`` implements the protocol locally for testing.
+
+Every upload carries an ``idempotency_key``, which is the SHA-256 of the PDF
+bytes. The webhook can use it to return the existing file instead of creating
+a duplicate. The client also remembers hash -> drive_url for a while, so
+uploading identical bytes again returns the known URL without sending
+anything.
+
+Several actions can share one POST through the ``batch`` envelope:
+
+    batch  {operations: [{id, action, ...}, ...]}  -> data.results: [{success, message, data}, ...]
+
+Results come back in order, one per operation. A value of the form
+``{"$ref": "<id>.data.<field>"}`` is replaced with that field of an earlier
+operation's result, so dependent calls such as upload-then-log still need
+only one trip. An operation whose reference failed is skipped. If a webhook
+deployment does not support ``batch``, the client sends the operations one
+by one and resolves the references itself.
+
+Calls are paced by a shared token-bucket rate limiter with a budget per
+action, so bursts from many sessions stay under the Apps Script quotas.
+When an action's budget is used up, callers wait for a token instead of
+receiving errors. They only fail if the wait would exceed
+``RATE_LIMIT_MAX_WAIT_SECONDS``.
+
+Read-only actions are coalesced: while a request is in flight, identical
+requests (same action and payload) from other sessions wait for it and share
+its response instead of calling Apps Script again.
+"""
+
+import base64
+import hashlib
+import io
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+# ============================================================================
+# CONSTANTS & CONFIGURATION
+# ============================================================================
+
+WEBHOOK_TIMEOUT = 30
+
+# (connect, read) timeouts in seconds. Interactive checks get a short read
+# budget; uploads of large decks get a long one.
+CONNECT_TIMEOUT = 3.05
+ACTION_TIMEOUTS = {
+    "test_connection": (CONNECT_TIMEOUT, 10),
+    "validate_email": (CONNECT_TIMEOUT, 6),
+    "validate_question_id": (CONNECT_TIMEOUT, 10),
+    "upload_pdf": (CONNECT_TIMEOUT, 180),
+    "log_submission": (CONNECT_TIMEOUT, 20),
+    "upload_start": (CONNECT_TIMEOUT, 20),
+    "upload_chunk": (CONNECT_TIMEOUT, 60),
+    "upload_status": (CONNECT_TIMEOUT, 10),
+    "upload_finish": (CONNECT_TIMEOUT, 120),
+    "log_submissions": (CONNECT_TIMEOUT, 30),
+    "get_roster": (CONNECT_TIMEOUT, 20),
+    "get_sot_changes": (CONNECT_TIMEOUT, 60),
+    "batch": (CONNECT_TIMEOUT, 180),
+}
+DEFAULT_ACTION_TIMEOUT = (CONNECT_TIMEOUT, WEBHOOK_TIMEOUT)
+
+# Circuit breaker: open after this many failed calls in a row, probe again after the cool-down
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_SECONDS = 30.0
+
+DEFAULT_MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+
+# Chunked uploads: PDFs above one chunk are sent in pieces of this size
+UPLOAD_CHUNK_BYTES = 2 * 1024 * 1024
+MAX_UPLOAD_RESUMES = 5  # Chunk failures tolerated (after per-request retries) before giving up
+UPLOAD_CANCELLED_RESULT = {"success": False, "cancelled": True, "message": "Upload cancelled"}
+
+# Content hash -> drive_url memory for repeated uploads of identical PDFs
+UPLOAD_CACHE_TTL_SECONDS = 6 * 60 * 60
+UPLOAD_CACHE_MAX_ENTRIES = 256
+
+# Connection pool shared by every session of the app
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 16
+
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Token-bucket budget for one webhook action"""
+    per_minute: float
+    burst: int  # Calls allowed back to back before pacing starts
+
+RATE_LIMITS = {
+    "test_connection": RateLimit(per_minute=30, burst=5),
+    "validate_email": RateLimit(per_minute=120, burst=20),
+    "validate_question_id": RateLimit(per_minute=120, burst=20),
+    "upload_pdf": RateLimit(per_minute=30, burst=5),
+    "upload_chunk": RateLimit(per_minute=240, burst=30),
+    "log_submission": RateLimit(per_minute=60, burst=10),
+    "log_submissions": RateLimit(per_minute=30, burst=5),
+    "get_roster": RateLimit(per_minute=12, burst=3),
+    "get_sot_changes": RateLimit(per_minute=12, burst=3),
+    "batch": RateLimit(per_minute=60, burst=10),
+}
+DEFAULT_RATE_LIMIT = RateLimit(per_minute=60, burst=10)
+RATE_LIMIT_MAX_WAIT_SECONDS = 20.0  # Longer queues fail instead of hanging the page
+
+# Actions without side effects; identical concurrent requests share one call
+COALESCED_ACTIONS = frozenset({
+    "test_connection", "validate_email", "validate_question_id",
+    "upload_status", "get_roster", "get_sot_changes",
+})
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often and how patiently one webhook action is retried"""
+    max_attempts: int
+    backoff_base: float = 0.5   # Seconds before the second attempt (before jitter)
+    backoff_max: float = 8.0
+    retry_read_timeouts: bool = True  # False when a repeat could duplicate side effects
+
+RETRY_POLICIES = {
+    "test_connection": RetryPolicy(max_attempts=2),
+    "validate_email": RetryPolicy(max_attempts=2, backoff_base=0.25, backoff_max=1.0),
+    "validate_question_id": RetryPolicy(max_attempts=3),
+    "upload_pdf": RetryPolicy(max_attempts=3, backoff_base=1.0, retry_read_timeouts=False),
+    "log_submission": RetryPolicy(max_attempts=4, retry_read_timeouts=False),
+    "upload_chunk": RetryPolicy(max_attempts=3),  # Offset-checked, so repeats are harmless
+    "upload_finish": RetryPolicy(max_attempts=3, backoff_base=1.0),
+    "log_submissions": RetryPolicy(max_attempts=2),  # Rows carry submission_id, so repeats are harmless
+    "get_roster": RetryPolicy(max_attempts=2, backoff_base=1.0),
+    "get_sot_changes": RetryPolicy(max_attempts=2, backoff_base=1.0),
+    "batch": RetryPolicy(max_attempts=2, backoff_base=1.0, retry_read_timeouts=False),
+}
+DEFAULT_RETRY_POLICY = RetryPolicy(max_attempts=2)
+UNKNOWN_ACTION_CODE = "unknown_action"  # error_code of a webhook that does not know an action
+
+def is_unsupported_action(result: dict) -> bool:
+    """True when the webhook deployment does not know the requested action"""
+    if result.get("success"):
+        return False
+    if "error_code" in result:
+        return result["error_code"] == UNKNOWN_ACTION_CODE
+    # Deployments without error codes only say so in the message
+    message = str(result.get("message", "")).lower()
+    return any(phrase in message for phrase in ("unknown action", "invalid action", "unsupported action"))
+
+def resolve_references(operation: dict, results_by_id: Dict[str, dict]) -> Tuple[Optional[dict], str]:
+    """Fill {"$ref": "<id>.data.<field>"} values from earlier batch results.
+
+    Returns (payload without its id, "") or (None, reason) when a reference cannot be met.
+    """
+    payload = {}
+    for key, value in operation.items():
+        if key == "id":
+            continue
+        if isinstance(value, dict) and "$ref" in value:
+            op_id, _, path = str(value["$ref"]).partition(".")
+            source = results_by_id.get(op_id)
+            if not source or not source.get("success"):
+                return None, f"Skipped: operation '{op_id}' did not succeed"
+            for part in path.split(".") if path else []:
+                source = source.get(part) if isinstance(source, dict) else None
+            if source is None:
+                return None, f"Skipped: '{value['$ref']}' is missing"
+            value = source
+        payload[key] = value
+    return payload, ""
+
+def backoff_delay(policy: RetryPolicy, attempt: int, retry_after: Optional[str] = None) -> float:
+    """Seconds to wait after a failed attempt (1-based), honouring Retry-After"""
+    cap = min(policy.backoff_max, policy.backoff_base * (2 ** (attempt - 1)))
+    if retry_after and retry_after.strip().isdigit():
+        return min(policy.backoff_max, float(retry_after))
+    return random.uniform(0, cap)  # Full jitter spreads out retries from concurrent sessions
+
+# ============================================================================
+# CACHING
+# ============================================================================
+
+class TTLCache:
+    """Thread-safe key -> value cache with per-entry expiry and a size cap"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[float, object]] = {}  # key -> (expires_at, value)
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return default
+            return entry[1]
+
+    def set(self, key: str, value, ttl_seconds: Optional[float] = None):
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                self._evict()
+            ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+            self._entries[key] = (time.monotonic() + ttl, value)
+
+    def pop(self, key: str, default=None):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return default if entry is None or entry[0] <= time.monotonic() else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _evict(self):
+        """Drop expired entries, or the one closest to expiry if none have expired"""
+        now = time.monotonic()
+        expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        if not expired and self._entries:
+            del self._entries[min(self._entries, key=lambda key: self._entries[key][0])]
+
+# ============================================================================
+# REQUEST COALESCING
+# ============================================================================
+
+class _InFlightCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    """Runs one call per key at a time; callers arriving meanwhile share its outcome"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _InFlightCall] = {}
+        self.shared_count = 0  # Calls answered by another caller's request
+
+    def do(self, key: str, fn: Callable[[], object]):
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _InFlightCall()
+            else:
+                self.shared_count += 1
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+# ============================================================================
+# RATE LIMITING
+# ============================================================================
+
+class RateLimitedError(Exception):
+    """Raised when a call would have to wait longer than the limiter allows"""
+
+class TokenBucket:
+    """Tokens refill continuously; reservations may go negative so waiters are served in order"""
+
+    def __init__(self, limit: RateLimit):
+        self.rate = limit.per_minute / 60.0
+        self.burst = limit.burst
+        self.tokens = float(limit.burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: float) -> float:
+        """Take one token; returns the seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+            if wait > max_wait:
+                raise RateLimitedError(f"Webhook rate limit: next slot in {wait:.0f}s")
+            self.tokens -= 1
+            return wait
+
+class RateLimiter:
+    """Per-action token buckets shared by every session, with wait statistics"""
+
+    def __init__(self, limits: Optional[Dict[str, RateLimit]] = None,
+                 max_wait: float = RATE_LIMIT_MAX_WAIT_SECONDS):
+        self.limits = limits or RATE_LIMITS
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._local = threading.local()
+
+    def acquire(self, action: str) -> float:
+        """Block until the action may be called; returns the seconds waited"""
+        with self._lock:
+            bucket = self._buckets.get(action)
+            if bucket is None:
+                bucket = self._buckets[action] = TokenBucket(self.limits.get(action, DEFAULT_RATE_LIMIT))
+        try:
+            wait = bucket.reserve(self.max_wait)
+        except RateLimitedError:
+            self._record(action, 0.0, rejected=True)
+            raise
+        if wait > 0:
+            time.sleep(wait)
+        self._record(action, wait)
+        self._local.waited = getattr(self._local, "waited", 0.0) + wait
+        return wait
+
+    def _record(self, action: str, wait: float, rejected: bool = False):
+        with self._lock:
+            stats = self._stats.setdefault(action, {"calls": 0, "waited_calls": 0, "wait_seconds": 0.0,
+                                                    "max_wait": 0.0, "rejected": 0})
+            if rejected:
+                stats["rejected"] += 1
+                return
+            stats["calls"] += 1
+            if wait > 0:
+                stats["waited_calls"] += 1
+                stats["wait_seconds"] += wait
+                stats["max_wait"] = max(stats["max_wait"], wait)
+
+    def take_wait(self) -> float:
+        """Seconds this thread spent waiting since the last call (for showing in the UI)"""
+        waited = getattr(self._local, "waited", 0.0)
+        self._local.waited = 0.0
+        return waited
+
+    def measure(self, function: Callable, *args, **kwargs) -> Tuple[object, float]:
+        """Run function and return (its result, seconds it waited); for work on pool threads"""
+        self.take_wait()  # Drop waits left on this thread by earlier, unmeasured work
+        result = function(*args, **kwargs)
+        return result, self.take_wait()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-action calls, waited_calls, wait_seconds, max_wait and rejected counts"""
+        with self._lock:
+            return {action: dict(stats) for action, stats in self._stats.items()}
+
+# ============================================================================
+# CIRCUIT BREAKER
+# ============================================================================
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the webhook while the circuit is open"""
+
+class CircuitBreaker:
+    """Thread-safe closed / open / half-open breaker shared by all actions"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_seconds: float = BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.last_error = ""
+
+    def before_call(self):
+        """Let a call through or raise CircuitOpenError"""
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_seconds:
+                    raise CircuitOpenError(f"Webhook unavailable, retrying in {self._retry_in():.0f}s")
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+
+            if self._state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    raise CircuitOpenError("Webhook unavailable, recovery check in progress")
+                self._probe_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+            self.last_error = ""
+
+    def release_probe(self):
+        """The call never reached the webhook (e.g. rate limited): it tells us nothing"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self, error: str):
+        with self._lock:
+            self._consecutive_failures += 1
+            self.last_error = error
+            if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def _retry_in(self) -> float:
+        return max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at))
+
+    def snapshot(self) -> dict:
+        """State for display: state, consecutive_failures, retry_in, last_error"""
+        with self._lock:
+            state = self._state
+            if state == self.OPEN and self._retry_in() == 0:
+                state = self.HALF_OPEN  # The next call will be the probe
+            return {
+                "state": state,
+                "consecutive_failures": self._consecutive_failures,
+                "retry_in": self._retry_in() if state == self.OPEN else 0.0,
+                "last_error": self.last_error
+            }
+
+# ============================================================================
+# CLIENT
+# ============================================================================
+
+class AppsScriptClient:
+    """Client for Google Apps Script webhook integration"""
+
+    def __init__(self, webhook_url: str, max_upload_bytes: int = DEFAULT_MAX_UPLOAD_BYTES,
+                 retry_policies: Optional[Dict[str, RetryPolicy]] = None,
+                 action_timeouts: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.webhook_url = webhook_url
+        self.max_upload_bytes = max_upload_bytes
+        self.retry_policies = retry_policies or RETRY_POLICIES
+        self.action_timeouts = action_timeouts or ACTION_TIMEOUTS
+        self.breaker = CircuitBreaker()
+        self.inflight = SingleFlight()
+        self.limiter = RateLimiter()
+        self.is_connected = False
+        self.last_test = None
+        self.batch_supported = True  # Until the deployment rejects the batch action
+        self.log_submissions_supported = True  # Until the deployment rejects log_submissions
+        self.upload_chunk_bytes = UPLOAD_CHUNK_BYTES
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._upload_ids: Dict[str, str] = {}  # Content sha256 -> unfinished upload_id
+        self._upload_ids_lock = threading.Lock()
+        self.uploaded_urls = TTLCache(UPLOAD_CACHE_TTL_SECONDS, UPLOAD_CACHE_MAX_ENTRIES)  # sha256 -> drive_url
+
+    def _get_session(self):
+        """Pooled keep-alive session, created on first use"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    # Deferred so app start-up does not pay for importing requests
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    # Retries are handled in _post so they can follow the per-action policy
+                    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+
+    def _post(self, payload: dict):
+        """POST a JSON payload, sharing identical in-flight read-only requests"""
+        if payload.get("action") not in COALESCED_ACTIONS:
+            return self._post_through_breaker(payload)
+
+        key = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return self.inflight.do(key, lambda: self._post_through_breaker(payload, preload=True))
+
+    def _post_through_breaker(self, payload: dict, preload: bool = False):
+        """POST a JSON payload through the circuit breaker; raises CircuitOpenError while open"""
+        self.breaker.before_call()
+        try:
+            response = self._post_with_retries(payload)
+        except RateLimitedError:
+            self.breaker.release_probe()
+            raise
+        except Exception as e:
+            self.breaker.record_failure(str(e))
+            raise
+
+        if response.status_code in RETRY_STATUS_CODES:
+            self.breaker.record_failure(f"HTTP {response.status_code}")
+        else:
+            self.breaker.record_success()
+        if preload:
+            response.content  # Read the body now so sharing callers only parse it
+        return response
+
+    def _post_with_retries(self, payload: dict):
+        """POST a JSON payload to the webhook, retrying transient failures per action"""
+        import requests
+
+        session = self._get_session()
+        action = payload.get("action")
+        policy = self.retry_policies.get(action, DEFAULT_RETRY_POLICY)
+        timeout = self.action_timeouts.get(action, DEFAULT_ACTION_TIMEOUT)
+
+        for attempt in range(1, policy.max_attempts + 1):
+            is_last_attempt = attempt == policy.max_attempts
+            try:
+                self.limiter.acquire(action)  # Every attempt counts against the quota
+                response = session.post(self.webhook_url, json=payload, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                # A read timeout means the request may already have been processed
+                repeatable = policy.retry_read_timeouts or not isinstance(e, requests.ReadTimeout)
+                if is_last_attempt or not repeatable:
+                    raise
+                time.sleep(backoff_delay(policy, attempt))
+                continue
+
+            if response.status_code in RETRY_STATUS_CODES and not is_last_attempt:
+                delay = backoff_delay(policy, attempt, response.headers.get("Retry-After"))
+                response.close()
+                time.sleep(delay)
+                continue
+
+            return response
+
+    def close(self):
+        """Release pooled connections"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def test_connection(self) -> dict:
+        """Test connection to Google Apps Script webhook"""
+        try:
+            if not self.webhook_url:
+                return {"success": False, "message": "Webhook URL not configured"}
+
+            response = self._post({"action": "test_connection"})
+
+            if response.status_code == 200:
+                result = response.json()
+                self._record_connection_test(result)
+                return result
+            else:
+                self.is_connected = False
+                return {"success": False, "message": f"HTTP {response.status_code}"}
+
+        except Exception as e:
+            self.is_connected = False
+            return {"success": False, "message": f"Connection error: {str(e)}"}
+
+    def _record_connection_test(self, result: dict):
+        """Remember the outcome of a test_connection answered by the webhook"""
+        self.is_connected = result.get("success", False)
+        self.last_test = datetime.now()
+
+    def validate_email(self, email: str, attempt_count: int = 1) -> dict:
+        """Validate email against Alias Emails spreadsheet"""
+        try:
+            if not self.webhook_url:
+                return {"success": False, "message": "Webhook URL not configured"}
+
+            response = self._post({
+                "action": "validate_email",
+                "email": email,
+                "attempt_count": attempt_count
+            })
+
+            if response.status_code == 200:
+                return response.json()
+            else:
+                return {"success": False, "transient": True, "message": f"Validation request failed: HTTP {response.status_code}"}
+
+        except Exception as e:
+            # transient: the webhook gave no verdict, so the result must not be cached
+            return {"success": False, "transient": True, "message": f"Email validation error: {str(e)}"}
+
+    def validate_question_id(self, question_id: str) -> dict:
+        """Validate Question ID against spreadsheet SOT"""
+        try:
+            if not self.webhook_url:
+                return {"success": True, "message": "Question ID accepted", "data": {"is_valid": True}}
+
+            response = self._post({
+                "action": "validate_question_id",
+                "question_id": question_id
+            })
+
+            if response.status_code == 200:
+                return response.json()
+            else:
+                return {"success": True, "message": "Question ID accepted", "data": {"is_valid": True}}
+
+        except Exception:
+            return {"success": True, "message": "Question ID accepted", "data": {"is_valid": True}}
+
+    def get_roster(self, if_version: str = "") -> dict:
+        """Fetch the authorized email roster; data.not_modified when if_version is current"""
+        try:
+            if not self.webhook_url:
+                return {"success": False, "message": "Webhook URL not configured"}
+
+            return self._post_json({"action": "get_roster", "if_version": if_version})
+
+        except Exception as e:
+            return {"success": False, "message": f"Roster request error: {str(e)}"}
+
+    def get_sot_changes(self, since_version: str = "") -> dict:
+        """Fetch SOT rows changed since since_version (all rows when data.full)"""
+        try:
+            if not self.webhook_url:
+                return {"success": False, "message": "Webhook URL not configured"}
+
+            return self._post_json({"action": "get_sot_changes", "since_version": since_version})
+
+        except Exception as e:
+            return {"success": False, "message": f"SOT request error: {str(e)}"}
+
+    def _post_json(self, payload: dict) -> dict:
+        """POST and decode the JSON result; HTTP errors become failed results"""
+        response = self._post(payload)
+        if response.status_code == 200:
+            return response.json()
+        return {"success": False, "message": f"HTTP {response.status_code}"}
+
+    def upload_pdf(self, pdf_buffer: io.BytesIO, filename: str, metadata: dict,
+                   progress_callback: Optional[Callable[[int, int], None]] = None,
+                   cancel_event: Optional[threading.Event] = None) -> dict:
+        """Upload PDF to Google Drive; progress_callback(bytes_sent, total_bytes) is optional.
+        
+        Setting cancel_event stops the upload before its next request; a cancelled
+        chunked upload can be resumed by uploading the same bytes again.
+        """
+        try:
+            if not self.webhook_url:
+                return {"success": False, "message": "Upload service unavailable"}
+
+            total_size = pdf_buffer.seek(0, io.SEEK_END)
+
+            # Check file size
+            if total_size > self.max_upload_bytes:
+                return {"success": False, "message": f"File too large. Maximum size is {self.max_upload_bytes // (1024 * 1024)}MB"}
+
+            content_sha256 = self._content_sha256(pdf_buffer)
+            drive_url = self.uploaded_urls.get(content_sha256)
+            if drive_url:
+                if progress_callback:
+                    progress_callback(total_size, total_size)
+                return {"success": True, "message": "File already uploaded", "data": {"drive_url": drive_url, "deduplicated": True}}
+
+            result = None
+            if total_size > self.upload_chunk_bytes:
+                result = self._upload_chunked(pdf_buffer, filename, metadata, total_size, content_sha256,
+                                              progress_callback, cancel_event)
+                # None: this webhook deployment predates chunked uploads
+
+            if result is None:
+                if cancel_event is not None and cancel_event.is_set():
+                    return dict(UPLOAD_CANCELLED_RESULT)
+                result = self._upload_single(pdf_buffer, filename, metadata, content_sha256)
+
+            drive_url = result.get("data", {}).get("drive_url") if result.get("success") else None
+            if drive_url:
+                self.uploaded_urls.set(content_sha256, drive_url)
+                if progress_callback:
+                    progress_callback(total_size, total_size)
+            return result
+
+        except Exception as e:
+            return {"success": False, "message": f"Upload service error: {str(e)}"}
+
+    def _upload_single(self, pdf_buffer: io.BytesIO, filename: str, metadata: dict, content_sha256: str) -> dict:
+        """Upload the whole PDF in one request"""
+        pdf_buffer.seek(0)
+        pdf_base64 = base64.b64encode(pdf_buffer.read()).decode('utf-8')
+
+        response = self._post({
+            "action": "upload_pdf",
+            "pdf_base64": pdf_base64,
+            "filename": filename,
+            "metadata": metadata,
+            "idempotency_key": content_sha256
+        })
+
+        if response.status_code == 200:
+            return response.json()
+        return {"success": False, "message": "Upload failed"}
+
+    def _content_sha256(self, pdf_buffer: io.BytesIO) -> str:
+        """Hash the buffer chunk by chunk"""
+        digest = hashlib.sha256()
+        pdf_buffer.seek(0)
+        for chunk in iter(lambda: pdf_buffer.read(self.upload_chunk_bytes), b""):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    def _resume_offset(self, upload_id: str) -> Optional[int]:
+        """Last offset the webhook acknowledged, or None if the upload is unknown"""
+        result = self._post_json({"action": "upload_status", "upload_id": upload_id})
+        received = result.get("data", {}).get("received")
+        return received if result.get("success") and isinstance(received, int) else None
+
+    def _upload_chunked(self, pdf_buffer: io.BytesIO, filename: str, metadata: dict, total_size: int,
+                        content_sha256: str, progress_callback: Optional[Callable[[int, int], None]],
+                        cancel_event: Optional[threading.Event] = None) -> Optional[dict]:
+        """Chunked upload resuming any unfinished upload of the same bytes; None if the webhook lacks it"""
+        with self._upload_ids_lock:
+            upload_id = self._upload_ids.get(content_sha256)
+        offset = self._resume_offset(upload_id) if upload_id else None
+
+        if offset is None:
+            start = self._post_json({
+                "action": "upload_start",
+                "filename": filename,
+                "metadata": metadata,
+                "total_size": total_size,
+                "chunk_size": self.upload_chunk_bytes,
+                "sha256": content_sha256,
+                "idempotency_key": content_sha256
+            })
+            if start.get("success") and start.get("data", {}).get("drive_url"):
+                return start  # The webhook already holds this exact file
+            if not start.get("success"):
+                if is_unsupported_action(start):
+                    return None
+                return start  # A real failure (outage, auth, ...): don't resend the whole PDF at once
+            upload_id = start.get("data", {}).get("upload_id")
+            if not upload_id:
+                return {"success": False, "message": "Upload start returned no upload_id"}
+            offset = 0
+            with self._upload_ids_lock:
+                self._upload_ids[content_sha256] = upload_id
+
+        failures = 0
+        last_error = ""
+        while offset < total_size:
+            if cancel_event is not None and cancel_event.is_set():
+                return dict(UPLOAD_CANCELLED_RESULT)  # upload_id is kept, so the same bytes resume here
+            if progress_callback:
+                progress_callback(offset, total_size)
+
+            pdf_buffer.seek(offset)
+            chunk = pdf_buffer.read(self.upload_chunk_bytes)
+            try:
+                result = self._post_json({
+                    "action": "upload_chunk",
+                    "upload_id": upload_id,
+                    "offset": offset,
+                    "chunk_base64": base64.b64encode(chunk).decode('utf-8')
+                })
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                result = {"success": False, "message": str(e)}
+
+            received = result.get("data", {}).get("received")
+            if result.get("success"):
+                offset = received if isinstance(received, int) else offset + len(chunk)
+                continue
+
+            failures += 1
+            last_error = result.get("message", "Chunk rejected")
+            if failures > MAX_UPLOAD_RESUMES:
+                return {
+                    "success": False,
+                    "message": f"Upload interrupted at {offset // 1024} of {total_size // 1024} KB ({last_error}). Try again to resume."
+                }
+            # Realign with what the webhook actually has (e.g. an acknowledged chunk whose reply was lost)
+            if not isinstance(received, int):
+                try:
+                    received = self._resume_offset(upload_id)
+                except CircuitOpenError:
+                    raise
+                except Exception:
+                    received = None
+            if isinstance(received, int):
+                offset = received
+
+        result = self._post_json({"action": "upload_finish", "upload_id": upload_id})
+        if result.get("success"):
+            with self._upload_ids_lock:
+                self._upload_ids.pop(content_sha256, None)
+        return result
+
+    def batch(self, operations: List[dict]) -> List[dict]:
+        """Run several actions in one POST; returns one result per operation, in order"""
+        operations = [{"id": str(index), **operation} for index, operation in enumerate(operations)]
+
+        def failed(message: str) -> List[dict]:
+            return [{"success": False, "message": message} for _ in operations]
+
+        if not self.webhook_url:
+            return failed("Webhook URL not configured")
+        if not self.batch_supported:
+            return self._run_operations_singly(operations)
+        try:
+            result = self._post_json({"action": "batch", "operations": operations})
+        except Exception as e:
+            return failed(f"Batch request error: {str(e)}")
+
+        if result.get("success"):
+            results = result.get("data", {}).get("results", [])
+            if len(results) != len(operations):
+                return failed(f"Batch returned {len(results)} results for {len(operations)} operations")
+            for operation, operation_result in zip(operations, results):
+                if operation.get("action") == "test_connection":
+                    self._record_connection_test(operation_result)
+            return results
+        if not is_unsupported_action(result):
+            return failed(result.get("message", "Batch rejected"))
+
+        # This webhook deployment predates batching: don't ask again
+        self.batch_supported = False
+        return self._run_operations_singly(operations)
+
+    def _run_operations_singly(self, operations: List[dict]) -> List[dict]:
+        """Batch fallback: send operations one by one, resolving references between them"""
+        results_by_id: Dict[str, dict] = {}
+        results = []
+        for operation in operations:
+            payload, skip_reason = resolve_references(operation, results_by_id)
+            if payload is None:
+                single_result = {"success": False, "message": skip_reason}
+            elif payload.get("action") == "test_connection":
+                single_result = self.test_connection()
+            else:
+                try:
+                    single_result = self._post_json(payload)
+                except Exception as e:
+                    single_result = {"success": False, "message": f"Request error: {str(e)}"}
+            results_by_id[operation["id"]] = single_result
+            results.append(single_result)
+        return results
+
+    def log_submission(self, form_data: dict) -> dict:
+        """Log one form submission to spreadsheet; failures are reported, not hidden"""
+        try:
+            if not self.webhook_url:
+                return {"success": False, "message": "Webhook URL not configured"}
+
+            return self._post_json({
+                "action": "log_submission",
+                **form_data
+            })
+
+        except Exception as e:
+            return {"success": False, "message": f"Submission logging error: {str(e)}"}
+
+    def log_submissions(self, submissions: List[dict]) -> Tuple[Set[str], str]:
+        """Log a batch of outbox rows; returns (accepted submission_ids, error message)"""
+        if not self.webhook_url:
+            return set(), "Webhook URL not configured"
+
+        if self.log_submissions_supported:
+            try:
+                result = self._post_json({"action": "log_submissions", "submissions": submissions})
+            except Exception as e:
+                return set(), f"Submission logging error: {str(e)}"
+
+            if result.get("success"):
+                accepted = result.get("data", {}).get("accepted")
+                if accepted is None:
+                    accepted = [submission["submission_id"] for submission in submissions]
+                return set(accepted), ""
+            if not is_unsupported_action(result):
+                return set(), result.get("message", "Batch rejected")
+
+            # This webhook deployment predates batching: don't ask again
+            self.log_submissions_supported = False
+
+        # Send rows one by one
+        accepted = set()
+        error = ""
+        for submission in submissions:
+            single_result = self.log_submission(submission)
+            if single_result.get("success"):
+                accepted.add(submission["submission_id"])
+            else:
+                error = single_result.get("message", "Submission rejected")
+        return accepted, error
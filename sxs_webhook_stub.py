@@ -0,0 +1,329 @@
+"""Local stand-in for the Google Apps Script webhook (stdlib only).
+
+Implements the JSON actions the app and ``AppsScriptClient`` use, including
+the chunked upload protocol, so uploads, retries and resumes can be tested
+without touching Drive or the spreadsheet:
+
+    python sxs_cli.py stub-webhook --port 8503 --storage /tmp/sxs-stub --fail-rate 0.2
+
+Then point the app at it with ``webhook_url = "http://127.0.0.1:8503/"`` in
+``.streamlit/secrets.toml``. Uploaded PDFs are written to the storage folder
+and served back from ``GET /files/<file_id>``, which becomes the drive_url.
+Submissions are appended to ``submissions.jsonl`` in the same folder.
+
+``--fail-rate`` makes that fraction of POSTs answer 503, and ``--drop-rate``
+makes that fraction store the request and then drop the reply. Together they
+exercise retries, the circuit breaker and upload resume.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set
+
+from sxs_question_ids import build_sot_lookup, extract_task_id_from_question_id, read_csv_rows
+from sxs_webhook import UNKNOWN_ACTION_CODE, resolve_references
+
+# ============================================================================
+# CONSTANTS & CONFIGURATION
+# ============================================================================
+
+DEFAULT_STUB_PORT = 8503
+COMPANY_FALLBACK_ATTEMPTS = 3  # Company-domain emails are accepted from this attempt on
+STUB_TABS = ["Alias Emails", "SOT", "Submissions"]
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# ============================================================================
+# STUB STATE
+# ============================================================================
+
+class StubBackend:
+    """In-process replacement for the spreadsheet and Drive folder"""
+
+    def __init__(self, storage_dir: str, alias_emails: Optional[Set[str]] = None,
+                 company_domain: str = "", sot_lookup: Optional[Dict[str, Dict[str, str]]] = None):
+        self.storage_dir = storage_dir
+        self.alias_emails = {email.lower() for email in (alias_emails or set())}
+        self.company_domain = company_domain.lower()
+        self.sot_lookup = sot_lookup or {}
+        self.base_url = ""
+        self._lock = threading.Lock()
+        self._uploads: Dict[str, dict] = {}
+        self._completed: Dict[str, dict] = {}  # idempotency_key -> upload result
+        self._finished: Dict[str, dict] = {}   # upload_id -> upload result, for repeated upload_finish
+        self._logged_ids: Set[str] = set()     # submission_ids already written
+        os.makedirs(storage_dir, exist_ok=True)
+
+    def handle(self, payload: dict) -> dict:
+        handler = getattr(self, f"action_{payload.get('action', '')}", None)
+        if handler is None:
+            return {"success": False, "message": f"Unknown action: {payload.get('action')}",
+                    "error_code": UNKNOWN_ACTION_CODE}
+        return handler(payload)
+
+    def action_batch(self, payload: dict) -> dict:
+        results_by_id: Dict[str, dict] = {}
+        results = []
+        for operation in payload.get("operations", []):
+            resolved, skip_reason = resolve_references(operation, results_by_id)
+            if resolved is None:
+                result = {"success": False, "message": skip_reason}
+            elif resolved.get("action") == "batch":
+                result = {"success": False, "message": "Nested batch is not supported"}
+            else:
+                result = self.handle(resolved)
+            results_by_id[str(operation.get("id", len(results)))] = result
+            results.append(result)
+        return {"success": True, "message": f"{len(results)} operation(s) run", "data": {"results": results}}
+
+    def action_test_connection(self, payload: dict) -> dict:
+        return {"success": True, "message": "Stub webhook ready", "data": {"tabs_found": STUB_TABS}}
+
+    def action_validate_email(self, payload: dict) -> dict:
+        email = str(payload.get("email", "")).strip().lower()
+        attempt_count = int(payload.get("attempt_count", 1))
+
+        if not EMAIL_PATTERN.match(email):
+            return {"success": False, "message": "Invalid email format", "data": {"attempt_count": attempt_count}}
+        if not self.alias_emails or email in self.alias_emails:
+            return {"success": True, "message": "Email found", "data": {"validation_type": "alias_list"}}
+        if self.company_domain and email.endswith("@" + self.company_domain):
+            if attempt_count >= COMPANY_FALLBACK_ATTEMPTS:
+                return {"success": True, "message": "Company email accepted", "data": {"validation_type": "company_fallback"}}
+            return {
+                "success": False,
+                "message": f"Email not in alias list (attempt {attempt_count} of {COMPANY_FALLBACK_ATTEMPTS})",
+                "data": {
+                    "attempt_count": attempt_count,
+                    "is_company_email": True,
+                    "attempts_remaining": COMPANY_FALLBACK_ATTEMPTS - attempt_count
+                }
+            }
+        return {"success": False, "message": "Email not authorized", "data": {"attempt_count": attempt_count}}
+
+    def action_get_roster(self, payload: dict) -> dict:
+        emails = sorted(self.alias_emails)
+        version = hashlib.sha256("\n".join(emails).encode("utf-8")).hexdigest()[:16]
+        if payload.get("if_version") == version:
+            return {"success": True, "data": {"version": version, "not_modified": True}}
+        return {"success": True, "data": {"version": version, "emails": emails}}
+
+    def action_get_sot_changes(self, payload: dict) -> dict:
+        # The stub SOT never changes after loading, so any other version gets a full copy
+        version = hashlib.sha256(json.dumps(self.sot_lookup, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        if payload.get("since_version") == version:
+            return {"success": True, "data": {"version": version, "full": False, "rows": [], "removed": []}}
+        rows = [
+            {"task_id": task_id, **{field: row.get(field, "") for field in ("language", "project_type", "model_comparison")}}
+            for task_id, row in self.sot_lookup.items()
+        ]
+        return {"success": True, "data": {"version": version, "full": True, "rows": rows, "removed": []}}
+
+    def action_validate_question_id(self, payload: dict) -> dict:
+        task_id = extract_task_id_from_question_id(str(payload.get("question_id", "")))
+        if not self.sot_lookup:
+            return {"success": True, "message": "Question ID accepted", "data": {"is_valid": True, "task_id": task_id}}
+
+        row = self.sot_lookup.get(task_id or "")
+        if row is None:
+            return {"success": True, "message": "Question ID not found in SOT", "data": {"is_valid": False, "task_id": task_id}}
+        return {"success": True, "message": "Question ID found", "data": {
+            "is_valid": True,
+            "task_id": task_id,
+            "language": row.get("language", ""),
+            "project_type": row.get("project_type", ""),
+            "model_comparison": row.get("model_comparison", "")
+        }}
+
+    def _store_pdf(self, filename: str, data: bytes, idempotency_key: str = "") -> dict:
+        with self._lock:
+            if idempotency_key in self._completed:
+                return self._completed[idempotency_key]
+
+        file_id = uuid.uuid4().hex[:16]
+        safe_name = re.sub(r'[^\w\-_.]', '_', filename or "upload.pdf")
+        with open(os.path.join(self.storage_dir, f"{file_id}_{safe_name}"), "wb") as pdf_file:
+            pdf_file.write(data)
+        result = {"success": True, "message": "File uploaded", "data": {
+            "file_id": file_id,
+            "drive_url": f"{self.base_url}/files/{file_id}",
+            "size": len(data)
+        }}
+        if idempotency_key:
+            with self._lock:
+                self._completed[idempotency_key] = result
+        return result
+
+    def find_file(self, file_id: str) -> Optional[str]:
+        for name in os.listdir(self.storage_dir):
+            if name.startswith(f"{file_id}_"):
+                return os.path.join(self.storage_dir, name)
+        return None
+
+    def action_upload_pdf(self, payload: dict) -> dict:
+        return self._store_pdf(
+            payload.get("filename", ""),
+            base64.b64decode(payload.get("pdf_base64", "")),
+            payload.get("idempotency_key", "")
+        )
+
+    def action_upload_start(self, payload: dict) -> dict:
+        idempotency_key = payload.get("idempotency_key", "")
+        with self._lock:
+            if idempotency_key in self._completed:
+                return self._completed[idempotency_key]
+
+        upload_id = uuid.uuid4().hex
+        part_path = os.path.join(self.storage_dir, f"{upload_id}.part")
+        open(part_path, "wb").close()
+        with self._lock:
+            self._uploads[upload_id] = {
+                "filename": payload.get("filename", ""),
+                "total_size": int(payload.get("total_size", 0)),
+                "idempotency_key": idempotency_key,
+                "received": 0,
+                "part_path": part_path
+            }
+        return {"success": True, "message": "Upload started", "data": {"upload_id": upload_id, "received": 0}}
+
+    def action_upload_chunk(self, payload: dict) -> dict:
+        with self._lock:
+            upload = self._uploads.get(payload.get("upload_id"))
+            if upload is None:
+                return {"success": False, "message": "Unknown upload_id"}
+            if int(payload.get("offset", -1)) != upload["received"]:
+                return {"success": False, "message": "Offset mismatch", "data": {"received": upload["received"]}}
+
+            chunk = base64.b64decode(payload.get("chunk_base64", ""))
+            with open(upload["part_path"], "ab") as part_file:
+                part_file.write(chunk)
+            upload["received"] += len(chunk)
+            return {"success": True, "data": {"received": upload["received"]}}
+
+    def action_upload_status(self, payload: dict) -> dict:
+        with self._lock:
+            upload = self._uploads.get(payload.get("upload_id"))
+            if upload is None:
+                return {"success": False, "message": "Unknown upload_id"}
+            return {"success": True, "data": {"received": upload["received"], "total_size": upload["total_size"]}}
+
+    def action_upload_finish(self, payload: dict) -> dict:
+        with self._lock:
+            if payload.get("upload_id") in self._finished:
+                return self._finished[payload["upload_id"]]
+            upload = self._uploads.get(payload.get("upload_id"))
+            if upload is None:
+                return {"success": False, "message": "Unknown upload_id"}
+            if upload["received"] != upload["total_size"]:
+                return {"success": False, "message": "Upload incomplete", "data": {"received": upload["received"]}}
+            del self._uploads[payload["upload_id"]]
+
+        with open(upload["part_path"], "rb") as part_file:
+            data = part_file.read()
+        os.remove(upload["part_path"])
+        result = self._store_pdf(upload["filename"], data, upload["idempotency_key"])
+        with self._lock:
+            self._finished[payload["upload_id"]] = result
+        return result
+
+    def _append_submissions(self, submissions: List[dict]) -> List[str]:
+        """Write submissions not seen before; returns every accepted submission_id"""
+        accepted = []
+        with self._lock:
+            with open(os.path.join(self.storage_dir, "submissions.jsonl"), "a", encoding="utf-8") as log_file:
+                for submission in submissions:
+                    submission_id = submission.get("submission_id", "")
+                    accepted.append(submission_id)
+                    if submission_id and submission_id in self._logged_ids:
+                        continue  # Retried send of a row already written
+                    entry = {key: value for key, value in submission.items() if key != "action"}
+                    entry["logged_at"] = datetime.now().isoformat()
+                    log_file.write(json.dumps(entry) + "\n")
+                    self._logged_ids.add(submission_id)
+        return accepted
+
+    def action_log_submission(self, payload: dict) -> dict:
+        self._append_submissions([payload])
+        return {"success": True, "message": "Submission logged"}
+
+    def action_log_submissions(self, payload: dict) -> dict:
+        accepted = self._append_submissions(payload.get("submissions", []))
+        return {"success": True, "message": f"{len(accepted)} submission(s) logged", "data": {"accepted": accepted}}
+
+# ============================================================================
+# HTTP HANDLER
+# ============================================================================
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """JSON POST endpoint plus GET /files/<file_id>; self.server.backend is the StubBackend"""
+
+    server_version = "SxSWebhookStub/1.0"
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real endpoint
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        match = re.fullmatch(r"/files/([0-9a-f]+)", self.path)
+        path = self.server.backend.find_file(match.group(1)) if match else None
+        if path is None:
+            self._send(404, b'{"success": false, "message": "Not found"}')
+            return
+        with open(path, "rb") as pdf_file:
+            self._send(200, pdf_file.read(), "application/pdf")
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        if random.random() < self.server.fail_rate:
+            self._send(503, b'{"success": false, "message": "Injected failure"}')
+            return
+
+        try:
+            result = self.server.backend.handle(json.loads(body or b"{}"))
+        except Exception as e:
+            result = {"success": False, "message": f"Stub error: {e}"}
+
+        if random.random() < self.server.drop_rate:
+            self.close_connection = True  # Processed, but the reply is lost
+            return
+
+        self._send(200, json.dumps(result).encode("utf-8"))
+
+def create_stub_server(host: str, port: int, backend: StubBackend,
+                       fail_rate: float = 0.0, drop_rate: float = 0.0,
+                       verbose: bool = False) -> ThreadingHTTPServer:
+    """Build the stub server; call serve_forever()"""
+    server = ThreadingHTTPServer((host, port), StubRequestHandler)
+    server.daemon_threads = True
+    server.backend = backend
+    server.fail_rate = fail_rate
+    server.drop_rate = drop_rate
+    server.verbose = verbose
+    backend.base_url = f"http://{host}:{server.server_port}"
+    return server
+
+def load_backend(storage_dir: str, alias_emails_path: Optional[str] = None,
+                 company_domain: str = "", sot_path: Optional[str] = None) -> StubBackend:
+    """Build a StubBackend from an alias email list (one per line) and an SOT CSV"""
+    alias_emails = set()
+    if alias_emails_path:
+        with open(alias_emails_path, encoding="utf-8") as emails_file:
+            alias_emails = {line.strip() for line in emails_file if line.strip()}
+    sot_lookup = build_sot_lookup(read_csv_rows(sot_path)) if sot_path else {}
+    return StubBackend(storage_dir, alias_emails, company_domain, sot_lookup)
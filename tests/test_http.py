@@ -0,0 +1,48 @@
+import json
+import os
+import signal
+import threading
+import urllib.error
+import urllib.request
+
+from sxs_http import create_server
+
+BOUNDARY = "sxs-test-boundary"
+
+def multipart_body(fields):
+    parts = [
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'
+        for name, value in fields.items()
+    ]
+    return ("".join(parts) + f"--{BOUNDARY}--\r\n").encode("utf-8")
+
+def test_crashed_worker_returns_json_500_with_timing():
+    server = create_server("127.0.0.1", 0, workers=1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        # Start the worker, then kill it so the pool is broken
+        executor = server.service.executor
+        executor.submit(os.getpid).result()
+        for process in list(executor._processes.values()):
+            os.kill(process.pid, signal.SIGKILL)
+            process.join()
+
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{server.server_port}/render",
+            data=multipart_body({"question_id": "q", "prompt": "p", "model1": "A", "model2": "B"}),
+            headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"}
+        )
+        try:
+            urllib.request.urlopen(request, timeout=30)
+            raise AssertionError("expected HTTP 500")
+        except urllib.error.HTTPError as response:
+            assert response.code == 500
+            assert response.headers["Content-Type"] == "application/json"
+            assert "X-Total-Seconds" in response.headers
+            payload = json.loads(response.read())
+            assert payload["success"] is False
+            assert "Render worker failed" in payload["message"]
+        assert server.service.active_requests == 0
+    finally:
+        server.shutdown()
+        server.service.shutdown()
@@ -0,0 +1,27 @@
+from sxs_question_ids import parse_question_id_info, reconcile_submissions
+
+# The sample from the app's Help section
+HELP_QUESTION_ID = (
+    "a5009505a2b411ff7b171226bb33306a+bard_data+coach_P128631_quality_sxs_e2e_experience_"
+    "learning_and_academic_help_frozen_pool_human_eval_en-US-50+INTERNAL+en:18019373568084263285"
+)
+HELP_TASK_ID = "coach_P128631_quality_sxs_e2e_experience_learning_and_academic_help_frozen_pool_human_eval_en-US-50"
+HELP_SOT = {
+    HELP_TASK_ID: {
+        "task_id": HELP_TASK_ID,
+        "language": "en-US",
+        "project_type": "Text",
+        "model_comparison": "Bard 2.5 Pro vs. AIS 2.5 Pro"
+    }
+}
+
+def test_help_example_without_logged_fields_has_no_issues():
+    # The Question ID says "Learning & Academic Help"; the SOT says "Text". Only logged values count.
+    assert parse_question_id_info(HELP_QUESTION_ID).project_type == "Learning & Academic Help"
+    assert reconcile_submissions([{"question_id": HELP_QUESTION_ID}], HELP_SOT) == []
+
+def test_logged_project_type_is_still_compared():
+    issues = reconcile_submissions([{"question_id": HELP_QUESTION_ID, "project_type": "Code"}], HELP_SOT)
+    assert [(issue["issue"], issue["logged"], issue["expected"]) for issue in issues] == [
+        ("project_type_mismatch", "Code", "Text")
+    ]